@@ -1,216 +1,551 @@
+from array import array
 from collections import deque
 import heapq
 
+from grid import NodeSet
+from queues import new_queue
+
+# Parent marker for nodes that have not been reached yet.
+UNREACHED = -1
+
+# Parent direction codes (see new_parent_codes): 0 = unreached, 1-6 = the
+# move back to the parent in neighbor_ids order, ROOT_CODE = search root.
+ROOT_CODE = 7
+CODE_BITS = 3
+CODE_MASK = (1 << CODE_BITS) - 1
+
+# Search events, yielded by the *_steps engines as (kind, node_id) pairs.
+EXPAND = 0  # node is being expanded; visualizers draw one frame per EXPAND
+PUSH = 1    # node entered the frontier
+POP = 2     # node left the frontier
+VISIT = 3   # node was marked visited
+FOUND = 4   # search succeeded; node is the goal or meeting point
+
+# Setup-screen algorithms that search by Grid.cost; sessions running them get random weights.
+WEIGHTED_ALGORITHMS = frozenset({"ucs", "bidirectional_ucs", "astar", "dstar_lite"})
+
+# Heuristic inflation search_by_name uses for "weighted_astar".
+WEIGHTED_ASTAR_FACTOR = 2.0
+
+# Grid size from which bidirectional_search switches to 2-bit depth codes.
+COMPACT_BIDIRECTIONAL_CELLS = 1 << 20
+
+
+def new_parents(grid, start):
+    """
+    Allocate a flat parent table for a search rooted at ``start``.
+
+    Each entry holds the node id a cell was reached from; the root points
+    to itself and unreached cells hold UNREACHED.
+    """
+    came_from = array("i", [UNREACHED]) * grid.size
+    came_from[start] = start
+    return came_from
+
+
+def new_parent_codes(grid, start):
+    """
+    Allocate a compact parent table for a search rooted at ``start``.
+
+    Each byte holds a 3-bit direction code instead of a node id: 0 for
+    unreached cells, ROOT_CODE for the root and otherwise which neighbor
+    (see parent_offsets) the cell was reached from. A full-grid search pays
+    one byte per cell instead of four, and the nonzero bytes double as the
+    set of reached cells.
+    """
+    codes = bytearray(grid.size)
+    codes[start] = ROOT_CODE
+    return codes
+
+
+def parent_offsets(grid):
+    """
+    Return the lookup tables for parent direction codes on ``grid``.
+
+    Returns:
+        encode: dict mapping ``parent - child`` to the child's code
+        offsets: tuple mapping a code to ``parent - child`` (0 for the root)
+    """
+    width = grid.width
+    # Up, Right, Bottom-Right, Bottom, Left, Top-Left, like neighbor_ids
+    offsets = (None, -width, 1, width + 1, width, -1, -width - 1, 0)
+    # Offsets coincide on one-column grids, but then they also name the same parent
+    encode = {offsets[code]: code for code in range(1, ROOT_CODE)}
+    return encode, offsets
+
+
+def new_costs(grid):
+    """
+    Allocate a flat path-cost table, four bytes per cell when every simple
+    path cost fits (eight otherwise).
+    """
+    typecode = "I" if 255 * grid.size < 1 << 32 else "q"
+    return array(typecode, [0]) * grid.size
+
+
+def new_depths(grid, start, max_depth):
+    """
+    Allocate a flat best-depth table for a depth-first search from ``start``.
+
+    Depths are stored in two bytes per cell when ``max_depth`` allows it
+    (four otherwise); cells that have not been reached hold the table's
+    ``unseen`` marker, which is larger than any depth.
+
+    Returns:
+        depths: array of best depths, 0 at the root
+        unseen: Marker value for unreached cells
+    """
+    typecode = "H" if max_depth < 0xFFFF else "I"
+    unseen = (1 << (8 * array(typecode).itemsize)) - 1
+    depths = array(typecode, [unseen]) * grid.size
+    depths[start] = 0
+    return depths, unseen
+
+
+def build_path(grid, came_from, goal):
+    """Walk a parent table back from ``goal`` and return (x, y) tuples from the root."""
+    path = []
+    if came_from[goal] == UNREACHED:
+        return path
+
+    current = goal
+    while True:
+        path.append(grid.node_pos(current))
+        parent = came_from[current]
+        if parent == current:
+            break
+        current = parent
+    path.reverse()
+    return path
+
+
+def build_code_path(grid, codes, goal, shift=0):
+    """
+    Walk a direction-code table back from ``goal`` and return (x, y) tuples
+    from the root.
+
+    ``shift`` selects the code field when several tables share one byte per
+    cell (codes of field ``shift`` live in bits shift..shift + 2).
+    """
+    offsets = parent_offsets(grid)[1]
+    node_pos = grid.node_pos
+    path = []
+    node = goal
+    code = (codes[node] >> shift) & CODE_MASK
+    if not code:
+        return path
+
+    while True:
+        path.append(node_pos(node))
+        if code == ROOT_CODE:
+            break
+        node += offsets[code]
+        code = (codes[node] >> shift) & CODE_MASK
+    path.reverse()
+    return path
+
+
+def run_steps(steps):
+    """Drive a step engine to completion and return its (path, visited) result."""
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+
+def _drive(steps, start, goal, visualizer, delay):
+    if visualizer:
+        return visualizer.play(steps, start, goal, delay)
+    return run_steps(steps)
+
+
+def bfs_steps(grid, start, goal, events=True):
+    """
+    Step engine for Breadth-First Search.
+
+    Yields (kind, node_id) events while ``events`` is true; with events off
+    the loop runs to completion without yielding. Either way the generator
+    returns (path, visited) like bfs_search.
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+
+    # Initialize the frontier with the start position
+    frontier = deque()
+    frontier.append(start_id)
+
+    # Direction codes to track where each node came from; every reached
+    # node is also visited, so the codes double as the visited flags
+    came_from = new_parent_codes(grid, start_id)
+    encode = parent_offsets(grid)[0]
+    if events:
+        yield PUSH, start_id
+        yield VISIT, start_id
+
+    # BFS main loop
+    while frontier:
+        current = frontier.popleft()
+        if events:
+            yield POP, current
+            yield EXPAND, current
+
+        # Check if we reached the goal
+        if current == goal_id:
+            if events:
+                yield FOUND, current
+            break
+
+        # Explore neighbors
+        for next_node in neighbors(current):
+            if not came_from[next_node]:
+                frontier.append(next_node)
+                came_from[next_node] = encode[current - next_node]
+                if events:
+                    yield PUSH, next_node
+                    yield VISIT, next_node
+
+    return build_code_path(grid, came_from, goal_id), NodeSet(grid, came_from)
+
+
 def bfs_search(grid, start, goal, visualizer=None, delay=100):
     """
     Breadth-First Search algorithm that finds the optimal path from start to goal.
-    
+
     Args:
         grid: Grid object containing the environment
         start: Tuple (x, y) representing start position
         goal: Tuple (x, y) representing goal position
         visualizer: GridVisualizer object for visualization (optional)
         delay: Delay in milliseconds between visualization steps
-    
+
     Returns:
         path: List of tuples representing the path from start to goal
         visited: Set of tuples representing all visited nodes
     """
+    steps = bfs_steps(grid, start, goal, events=visualizer is not None)
+    return _drive(steps, start, goal, visualizer, delay)
+
+
+def dfs_steps(grid, start, goal, events=True):
+    """Step engine for Depth-First Search; see bfs_steps for the protocol."""
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+
     # Initialize the frontier with the start position
     frontier = deque()
-    frontier.append(start)
-    
-    # Dictionary to track where each node came from
-    came_from = {start: None}
-    
-    # Set to track visited nodes for visualization
-    visited = set()
-    visited.add(start)
-    
-    # BFS main loop
+    frontier.append(start_id)
+
+    # Direction codes to track where each node came from, doubling as the
+    # visited flags (see bfs_steps)
+    came_from = new_parent_codes(grid, start_id)
+    encode = parent_offsets(grid)[0]
+    if events:
+        yield PUSH, start_id
+        yield VISIT, start_id
+
+    # DFS main loop
     while frontier:
-        current = frontier.popleft()
-        
-        # Visualize current state
-        if visualizer:
-            visualizer.draw_grid(
-                path=None,
-                start=start,
-                goal=goal,
-                visited=visited,
-                current=current,
-                frontier=list(frontier)
-            )
-            visualizer.delay(delay)
-        
+        current = frontier.pop()  # Pop from the end to simulate DFS behavior
+        if events:
+            yield POP, current
+            yield EXPAND, current
+
         # Check if we reached the goal
-        if current == goal:
+        if current == goal_id:
+            if events:
+                yield FOUND, current
             break
-        
+
         # Explore neighbors
-        for next_node in grid.get_neighbors(current):
-            if next_node not in came_from:
+        for next_node in neighbors(current):
+            if not came_from[next_node]:
                 frontier.append(next_node)
-                came_from[next_node] = current
-                visited.add(next_node)
-    
-    # Reconstruct path
-    path = []
-    if goal in came_from:
-        current = goal
-        while current is not None:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()
-    
-    return path, visited
+                came_from[next_node] = encode[current - next_node]
+                if events:
+                    yield PUSH, next_node
+                    yield VISIT, next_node
+
+    return build_code_path(grid, came_from, goal_id), NodeSet(grid, came_from)
 
 
 def dfs_search(grid, start, goal, visualizer=None, delay=100):
     """
     Depth-First Search algorithm that finds a path from start to goal.
-    
+
     Args:
         grid: Grid object containing the environment
         start: Tuple (x, y) representing start position
         goal: Tuple (x, y) representing goal position
         visualizer: GridVisualizer object for visualization (optional)
         delay: Delay in milliseconds between visualization steps
-    
+
     Returns:
         path: List of tuples representing the path from start to goal
         visited: Set of tuples representing all visited nodes
     """
+    steps = dfs_steps(grid, start, goal, events=visualizer is not None)
+    return _drive(steps, start, goal, visualizer, delay)
+
+
+def ucs_steps(grid, start, goal, events=True, queue=None):
+    """
+    Step engine for Uniform Cost Search; see bfs_steps for the protocol.
+
+    ``queue`` names the priority queue backend (see queues.QUEUE_BACKENDS);
+    by default queues.select_queue picks one from the grid's weights.
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+    weights = grid.weight_map
+
     # Initialize the frontier with the start position
-    frontier = deque()
-    frontier.append(start)
-    
-    # Dictionary to track where each node came from
-    came_from = {start: None}
-    
-    # Set to track visited nodes for visualization
-    visited = set()
-    visited.add(start)
-    
-    # DFS main loop
+    frontier = new_queue(grid, queue)
+    push = frontier.push
+    pop = frontier.pop
+    push(start_id, 0)
+    if events:
+        yield PUSH, start_id
+
+    # Direction codes to track where each node came from
+    came_from = new_parent_codes(grid, start_id)
+    encode = parent_offsets(grid)[0]
+
+    # Cost to reach each node (only meaningful once the node is reached)
+    cost_so_far = new_costs(grid)
+
+    # Per-cell flags to track visited nodes for visualization
+    visited = bytearray(grid.size)
+
+    # UCS main loop
     while frontier:
-        current = frontier.pop()  # Pop from the end to simulate DFS behavior
-        
-        # Visualize current state
-        if visualizer:
-            visualizer.draw_grid(
-                path=None,
-                start=start,
-                goal=goal,
-                visited=visited,
-                current=current,
-                frontier=list(frontier)
-            )
-            visualizer.delay(delay)
-        
+        current_cost, current = pop()  # Pop the node with the lowest cost
+        if events:
+            yield POP, current
+
+        # Skip if we've already visited this node
+        if visited[current]:
+            continue
+
+        visited[current] = 1
+        if events:
+            yield VISIT, current
+            yield EXPAND, current
+
         # Check if we reached the goal
-        if current == goal:
+        if current == goal_id:
+            if events:
+                yield FOUND, current
             break
-        
+
         # Explore neighbors
-        for next_node in grid.get_neighbors(current):
-            if next_node not in came_from:
-                frontier.append(next_node)
-                came_from[next_node] = current
-                visited.add(next_node)
-    
-    # Reconstruct path
-    path = []
-    if goal in came_from:
-        current = goal
-        while current is not None:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()
-    
-    return path, visited
+        for next_node in neighbors(current):
+            new_cost = current_cost + weights[next_node]
+
+            # Only add neighbor if not reached yet or if we found a cheaper path
+            if not came_from[next_node] or new_cost < cost_so_far[next_node]:
+                cost_so_far[next_node] = new_cost
+                came_from[next_node] = encode[current - next_node]
+                # Decrease-key backends re-queue in place without a new entry
+                queued = push(next_node, new_cost)
+                if events and queued:
+                    yield PUSH, next_node
 
+    return build_code_path(grid, came_from, goal_id), NodeSet(grid, visited)
 
-def ucs_search(grid, start, goal, visualizer=None, delay=100):
+
+def ucs_search(grid, start, goal, visualizer=None, delay=100, queue=None):
     """
     Uniform Cost Search algorithm that finds the optimal path from start to goal.
-    
+
     Args:
         grid: Grid object containing the environment
         start: Tuple (x, y) representing start position
         goal: Tuple (x, y) representing goal position
         visualizer: GridVisualizer object for visualization (optional)
         delay: Delay in milliseconds between visualization steps
-    
+        queue: Priority queue backend name ("heapq", "dial", "radix",
+            "indexed"); chosen from the grid's weights by default
+
     Returns:
         path: List of tuples representing the path from start to goal
         visited: Set of tuples representing all visited nodes
     """
+    steps = ucs_steps(grid, start, goal, events=visualizer is not None, queue=queue)
+    return _drive(steps, start, goal, visualizer, delay)
+
+
+def move_heuristic(grid, goal_id, scale=None):
+    """
+    Default A* heuristic: Grid.move_distance to the goal times the smallest
+    cell weight.
+
+    The move distance is the exact move count for the six-direction move set
+    on an open grid, so the estimate never overestimates Grid.cost and is
+    consistent.
+
+    Args:
+        grid: Grid object containing the environment
+        goal_id: Node id of the goal
+        scale: Cost per move (default: the smallest weight on the grid);
+            callers that already know it skip the weight scan
+
+    Returns:
+        heuristic: Callable mapping a node id to a lower bound on its cost
+            to ``goal_id``
+    """
+    width = grid.width
+    goal_y, goal_x = divmod(goal_id, width)
+    if scale is None:
+        scale = grid.weight_range()[0]
+
+    def heuristic(node):
+        y, x = divmod(node, width)
+        dx = goal_x - x
+        dy = goal_y - y
+        if (dx >= 0) == (dy >= 0):
+            moves = (dx if dx > dy else dy) if dx >= 0 else (-dx if dx < dy else -dy)
+        else:
+            moves = (dx if dx > 0 else -dx) + (dy if dy > 0 else -dy)
+        return moves * scale
+
+    return heuristic
+
+
+def astar_steps(grid, start, goal, events=True, weight=1.0, heuristic=None):
+    """
+    Step engine for A* / weighted A*; see bfs_steps for the protocol.
+
+    Nodes are ordered by g + weight * h, ties going to the node closer to
+    the goal. ``heuristic`` maps a node id to a lower bound on its cost to
+    the goal (move_heuristic when None); it must be consistent for the
+    returned path to be optimal at weight 1.
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+    weights = grid.weight_map
+    if heuristic is None:
+        heuristic = move_heuristic(grid, goal_id)
+
     # Initialize the frontier with the start position
     frontier = []
-    heapq.heappush(frontier, (0, start))  # (cost, node)
-    
-    # Dictionary to track where each node came from
-    came_from = {start: None}
-    
-    # Dictionary to track the cost to reach each node
-    cost_so_far = {start: 0}
-    
-    # Set to track visited nodes for visualization
-    visited = set()
-    
-    # UCS main loop
+    start_h = heuristic(start_id)
+    heapq.heappush(frontier, (start_h * weight, start_h, start_id))  # (f, h, node)
+    if events:
+        yield PUSH, start_id
+
+    # Parent direction codes and cost to reach each node
+    came_from = new_parent_codes(grid, start_id)
+    encode = parent_offsets(grid)[0]
+    cost_so_far = new_costs(grid)
+
+    # Per-cell flags to track closed nodes for visualization
+    visited = bytearray(grid.size)
+
+    # A* main loop
     while frontier:
-        current_cost, current = heapq.heappop(frontier)  # Pop the node with the lowest cost
-        
-        # Skip if we've already visited this node
-        if current in visited:
+        _, _, current = heapq.heappop(frontier)
+        if events:
+            yield POP, current
+
+        # Skip stale entries of nodes that are already closed
+        if visited[current]:
             continue
-        
-        visited.add(current)
-        
-        # Visualize current state
-        if visualizer:
-            visualizer.draw_grid(
-                path=None,
-                start=start,
-                goal=goal,
-                visited=visited,
-                current=current,
-                frontier=[node for _, node in frontier]
-            )
-            visualizer.delay(delay)
-        
-        # Check if we reached the goal
-        if current == goal:
+
+        visited[current] = 1
+        if events:
+            yield VISIT, current
+            yield EXPAND, current
+
+        if current == goal_id:
+            if events:
+                yield FOUND, current
             break
-        
-        # Explore neighbors
-        for next_node in grid.get_neighbors(current):
-            new_cost = cost_so_far[current] + grid.cost(next_node)
-            
-            # Only add neighbor if not visited or if we found a cheaper path
-            if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
+
+        current_cost = cost_so_far[current]
+        for next_node in neighbors(current):
+            if visited[next_node]:
+                # Closed nodes are never re-opened; with weight > 1 this keeps
+                # the cost within weight x optimal.
+                continue
+            new_cost = current_cost + weights[next_node]
+            if not came_from[next_node] or new_cost < cost_so_far[next_node]:
                 cost_so_far[next_node] = new_cost
-                came_from[next_node] = current
-                heapq.heappush(frontier, (new_cost, next_node))
-    
-    # Reconstruct path
-    path = []
-    if goal in came_from:
-        current = goal
-        while current is not None:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()
-    
-    return path, visited
+                came_from[next_node] = encode[current - next_node]
+                h = heuristic(next_node)
+                heapq.heappush(frontier, (new_cost + h * weight, h, next_node))
+                if events:
+                    yield PUSH, next_node
+
+    return build_code_path(grid, came_from, goal_id), NodeSet(grid, visited)
 
 
-def dls_search(grid, start, goal, depth_limit, visualizer=None, delay=100):
+def astar_search(grid, start, goal, visualizer=None, delay=100, weight=1.0, heuristic=None):
+    """
+    A* search that finds the cheapest path from start to goal under Grid.cost.
+
+    Args:
+        grid: Grid object containing the environment
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        visualizer: GridVisualizer object for visualization (optional)
+        delay: Delay in milliseconds between visualization steps
+        weight: Heuristic inflation; above 1 trades optimality for fewer
+            expansions, returning a path costing at most weight x optimal
+        heuristic: Callable giving a node id's lower-bound cost to the goal
+            (default: move_heuristic), e.g. from landmarks.Landmarks
+
+    Returns:
+        path: List of tuples representing the path from start to goal
+        visited: Set of tuples representing all expanded nodes
+    """
+    if weight < 1:
+        raise ValueError(f"A* weight must be >= 1, got {weight}")
+    steps = astar_steps(grid, start, goal, events=visualizer is not None, weight=weight, heuristic=heuristic)
+    return _drive(steps, start, goal, visualizer, delay)
+
+
+def dls_steps(grid, start, goal, depth_limit, events=True, prune=False):
+    """
+    Step engine for Depth-Limited Search; see bfs_steps for the protocol.
+
+    Nodes are re-opened whenever a shallower branch reaches them, so the
+    goal is found whenever it lies within ``depth_limit`` moves. With
+    ``prune`` the search is no longer uninformed: branches that could not
+    reach the goal within the limit even on an open grid (see
+    Grid.move_distance) are not entered, which the benchmarks use to keep
+    re-opening affordable on large maps.
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+
+    # Parent table and best depth each node has been reached at
+    came_from = new_parents(grid, start_id)
+    depths, unseen = new_depths(grid, start_id, depth_limit)
+
+    # Per-cell flags to track visited nodes for visualization
+    visited = bytearray(grid.size)
+    visited[start_id] = 1
+    if events:
+        yield VISIT, start_id
+
+    found, _, _ = yield from _depth_first(
+        grid.neighbor_lookup(), start_id, goal_id, depth_limit, depths, unseen,
+        came_from, visited, events, distance=grid.move_distance if prune else None,
+    )
+
+    path = build_path(grid, came_from, goal_id) if found else []
+    return path, NodeSet(grid, visited)
+
+
+def dls_search(grid, start, goal, depth_limit, visualizer=None, delay=100, prune=False):
     """
     Depth-Limited Search algorithm that finds a path within a depth limit.
-    
+
     Args:
         grid: Grid object containing the environment
         start: Tuple (x, y) representing start position
@@ -218,159 +553,569 @@ def dls_search(grid, start, goal, depth_limit, visualizer=None, delay=100):
         depth_limit: Maximum depth to search
         visualizer: GridVisualizer object for visualization (optional)
         delay: Delay in milliseconds between visualization steps
-    
+        prune: Skip branches that cannot reach the goal within the limit
+            (see dls_steps)
+
     Returns:
         path: List of tuples representing the path from start to goal
         visited: Set of tuples representing all visited nodes
     """
-    # Initialize the frontier with (start, depth=0)
-    frontier = deque()
-    frontier.append((start, 0))
-    
-    # Dictionary to track where each node came from
-    came_from = {start: None}
-    
-    # Set to track visited nodes for visualization
-    visited = set()
-    visited.add(start)
-    
-    # DLS main loop
-    while frontier:
-        current, depth = frontier.pop()  # Pop from the end to simulate DFS behavior
-        
-        # Visualize current state
-        if visualizer:
-            visualizer.draw_grid(
-                path=None,
-                start=start,
-                goal=goal,
-                visited=visited,
-                current=current,
-                frontier=[node for (node, _) in frontier]
-            )
-            visualizer.delay(delay)
-        
-        # Check if we reached the goal
-        if current == goal:
-            break
-        
-        # Explore neighbors only if within depth limit
-        if depth < depth_limit:
-            for next_node in grid.get_neighbors(current):
-                if next_node not in came_from:
-                    frontier.append((next_node, depth + 1))
-                    came_from[next_node] = current
-                    visited.add(next_node)
-    
-    # Reconstruct path
-    path = []
-    if goal in came_from:
-        current = goal
-        while current is not None:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()
-    
-    return path, visited
+    steps = dls_steps(grid, start, goal, depth_limit, events=visualizer is not None, prune=prune)
+    return _drive(steps, start, goal, visualizer, delay)
 
 
-def reconstruct_bidirectional(came_f, came_b, meeting_point):
+def reconstruct_bidirectional(grid, came_f, came_b, meeting_point, shifts=(0, 0)):
     """
     Helper function to reconstruct the path found by bidirectional search.
-    
+
     Args:
-        came_f: Dictionary of parents from forward search
-        came_b: Dictionary of parents from backward search
-        meeting_point: The node where forward and backward searches met
-    
+        grid: Grid object containing the environment
+        came_f: Direction-code table from forward search
+        came_b: Direction-code table from backward search
+        meeting_point: Node id where forward and backward searches met
+        shifts: Bit offsets of the forward and backward codes, for tables
+            that pack both sides into one byte per cell
+
     Returns:
         path: List of tuples representing the complete path from start to goal
     """
     # Build path from start to meeting point
-    path_f = []
-    current = meeting_point
-    while current is not None:
-        path_f.append(current)
-        current = came_f[current]
-    path_f.reverse()
-    
+    path_f = build_code_path(grid, came_f, meeting_point, shifts[0])
+
     # Build path from meeting point to goal
-    path_b = []
-    current = came_b[meeting_point]  # Start from parent of meeting point in backward search
-    while current is not None:
-        path_b.append(current)
-        current = came_b[current]
-    
-    # Combine paths
-    return path_f + path_b
+    path_b = build_code_path(grid, came_b, meeting_point, shifts[1])
+    path_b.reverse()
+
+    # Combine paths, sharing the meeting point
+    return path_f + path_b[1:]
+
+
+def _walk_depth_codes(grid, marks, shift, node, depth):
+    """Follow 2-bit depth codes from ``node`` back to the side's root; returns ids, root last."""
+    neighbors = grid.neighbor_lookup()
+    mask = 3 << shift
+    walk = [node]
+    while depth > 0:
+        depth -= 1
+        code = (depth % 3 + 1) << shift
+        for next_node in neighbors(node):
+            if marks[next_node] & mask == code:
+                node = next_node
+                break
+        walk.append(node)
+    return walk
 
 
-def bidirectional_search(grid, start, goal, visualizer=None, delay=50):
+def reconstruct_bidirectional_compact(grid, marks, meeting_point, depth_f, depth_b):
+    """
+    Reconstruct a bidirectional path from 2-bit depth codes instead of parent tables.
+
+    Each cell of ``marks`` holds the forward depth code in bits 0-1 and the
+    backward one in bits 2-3 (0 = unreached, else depth % 3 + 1). BFS depths
+    of neighbors differ by at most one, so the predecessor is the neighbor
+    whose code is one depth lower.
+
+    Args:
+        grid: Grid object containing the environment
+        marks: bytearray of depth codes, one byte per cell
+        meeting_point: Node id reached by both searches
+        depth_f: Forward depth of the meeting point
+        depth_b: Backward depth of the meeting point
+
+    Returns:
+        path: List of tuples representing the complete path from start to goal
+    """
+    forward = _walk_depth_codes(grid, marks, 0, meeting_point, depth_f)
+    backward = _walk_depth_codes(grid, marks, 2, meeting_point, depth_b)
+    forward.reverse()
+    return [grid.node_pos(node) for node in forward + backward[1:]]
+
+
+def bidirectional_steps(grid, start, goal, events=True, compact=False):
+    """
+    Step engine for Bidirectional Search; see bfs_steps for the protocol.
+
+    Both sides grow one whole BFS level at a time, always on the side with
+    the smaller frontier. A meeting is detected as soon as one side
+    generates a node the other side has reached; at that point every path
+    shorter than the one through it would have met on an earlier level, so
+    the first meeting is a shortest path.
+
+    Both sides keep their parent direction codes in one shared byte per
+    cell: forward in bits 0-2, backward in bits 3-5. With ``compact`` they
+    are replaced by 2-bit depth codes per side, and the path is rebuilt by
+    searching the neighbors for the next depth code instead of following
+    directions (see reconstruct_bidirectional_compact).
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+
+    # Nodes reached by either side, with each side's direction or depth codes
+    visited = bytearray(grid.size)
+    if compact:
+        visited[start_id] = 1
+        visited[goal_id] |= 1 << 2
+    else:
+        encode = parent_offsets(grid)[0]
+        visited[start_id] = ROOT_CODE
+        visited[goal_id] |= ROOT_CODE << CODE_BITS
+    if events:
+        for node in (start_id, goal_id):
+            yield PUSH, node
+            yield VISIT, node
+
+    if start_id == goal_id:
+        if events:
+            yield FOUND, start_id
+        return [start], NodeSet(grid, visited)
+
+    # Current level and its depth, forward (0) and backward (1)
+    levels = [[start_id], [goal_id]]
+    depths = [0, 0]
+
+    while levels[0] and levels[1]:
+        side = 0 if len(levels[0]) <= len(levels[1]) else 1
+        other = 1 - side
+        next_depth = depths[side] + 1
+        if compact:
+            own_mask = 3 << (2 * side)
+            other_mask = 3 << (2 * other)
+            code = (next_depth % 3 + 1) << (2 * side)
+        else:
+            shift = CODE_BITS * side
+            own_mask = CODE_MASK << shift
+            other_mask = CODE_MASK << (CODE_BITS * other)
+
+        next_level = []
+        for current in levels[side]:
+            if events:
+                yield POP, current
+                yield EXPAND, current
+
+            for next_node in neighbors(current):
+                mark = visited[next_node]
+                if mark & own_mask:
+                    continue
+                if not compact:
+                    code = encode[current - next_node] << shift
+                visited[next_node] = mark | code
+                met = mark & other_mask
+                next_level.append(next_node)
+                if events:
+                    yield PUSH, next_node
+                    yield VISIT, next_node
+
+                if met:
+                    if events:
+                        yield FOUND, next_node
+                    if compact:
+                        depths[side] = next_depth
+                        path = reconstruct_bidirectional_compact(grid, visited, next_node, depths[0], depths[1])
+                    else:
+                        path = reconstruct_bidirectional(grid, visited, visited, next_node, (0, CODE_BITS))
+                    return path, NodeSet(grid, visited)
+
+        levels[side] = next_level
+        depths[side] = next_depth
+
+    return [], NodeSet(grid, visited)
+
+
+def bidirectional_search(grid, start, goal, visualizer=None, delay=50, compact=None):
     """
     Bidirectional Search algorithm that searches from both start and goal simultaneously.
-    
+
     Args:
         grid: Grid object containing the environment
         start: Tuple (x, y) representing start position
         goal: Tuple (x, y) representing goal position
         visualizer: GridVisualizer object for visualization (optional)
         delay: Delay in milliseconds between visualization steps
-    
+        compact: Use 2-bit depth codes instead of direction codes; by default
+            only for grids of at least COMPACT_BIDIRECTIONAL_CELLS cells
+
     Returns:
         path: List of tuples representing the path from start to goal
         visited: Set of tuples representing all visited nodes
     """
-    # Two frontiers
-    frontier_f = deque([start])  # Forward
-    frontier_b = deque([goal])   # Backward
-    
-    # Two "came_from" dictionaries
-    came_f = {start: None}
-    came_b = {goal: None}
-    
-    while frontier_f and frontier_b:
-        # 1. Expand Forward
-        if frontier_f:
-            current_f = frontier_f.popleft()
-            
-            # Check if forward search meets backward search
-            if current_f in came_b:
-                path = reconstruct_bidirectional(came_f, came_b, current_f)
-                visited = set(came_f.keys()) | set(came_b.keys())
-                return path, visited
-            
-            # Explore neighbors in forward direction
-            for next_node in grid.get_neighbors(current_f):
-                if next_node not in came_f:
-                    came_f[next_node] = current_f
-                    frontier_f.append(next_node)
-        
-        # 2. Expand Backward
-        if frontier_b:
-            current_b = frontier_b.popleft()
-            
-            # Check if backward search meets forward search
-            if current_b in came_f:
-                path = reconstruct_bidirectional(came_f, came_b, current_b)
-                visited = set(came_f.keys()) | set(came_b.keys())
-                return path, visited
-            
-            # Explore neighbors in backward direction
-            for next_node in grid.get_neighbors(current_b):
-                if next_node not in came_b:
-                    came_b[next_node] = current_b
-                    frontier_b.append(next_node)
-        
-        # 3. Visualization
+    if compact is None:
+        compact = grid.size >= COMPACT_BIDIRECTIONAL_CELLS
+    steps = bidirectional_steps(grid, start, goal, events=visualizer is not None, compact=compact)
+    return _drive(steps, start, goal, visualizer, delay)
+
+
+def bidirectional_ucs_steps(grid, start, goal, events=True):
+    """
+    Step engine for Bidirectional Uniform Cost Search; see bfs_steps for the protocol.
+
+    A forward Dijkstra from ``start`` and a backward one from ``goal`` run
+    side by side, each step settling a node on the side whose frontier has
+    the cheaper top. Entering a cell costs its weight, so the backward side
+    pays the weight of the node it leaves. Every relaxation that touches a
+    node reached by the other side offers a meeting; the search stops once
+    the two frontier tops together cost at least the best meeting, at which
+    point no cheaper path can remain.
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+    weights = grid.weight_map
+
+    # Forward (0) and backward (1) frontiers, costs and settled flags; the
+    # direction codes of both sides share one byte per cell (forward in
+    # bits 0-2, backward in bits 3-5)
+    frontiers = ([(0, start_id)], [(0, goal_id)])
+    came_from = new_parent_codes(grid, start_id)
+    came_from[goal_id] |= ROOT_CODE << CODE_BITS
+    encode = parent_offsets(grid)[0]
+    costs = (new_costs(grid), new_costs(grid))
+    settled = (bytearray(grid.size), bytearray(grid.size))
+
+    # Nodes settled by either side, for visualization
+    visited = bytearray(grid.size)
+    if events:
+        yield PUSH, start_id
+        yield PUSH, goal_id
+
+    best_cost = 0 if start_id == goal_id else None
+    meeting_point = start_id if start_id == goal_id else UNREACHED
+
+    while frontiers[0] and frontiers[1]:
+        if best_cost is not None and frontiers[0][0][0] + frontiers[1][0][0] >= best_cost:
+            break
+
+        side = 0 if frontiers[0][0][0] <= frontiers[1][0][0] else 1
+        frontier = frontiers[side]
+        shift = CODE_BITS * side
+        own_mask = CODE_MASK << shift
+        other_mask = CODE_MASK << (CODE_BITS - shift)
+        cost_so_far = costs[side]
+        done = settled[side]
+        other_cost = costs[1 - side]
+
+        current_cost, current = heapq.heappop(frontier)
+        if events:
+            yield POP, current
+        if done[current]:
+            continue
+
+        done[current] = 1
+        visited[current] = 1
+        if events:
+            yield VISIT, current
+            yield EXPAND, current
+
+        # Forward moves pay the weight of the cell entered, backward moves
+        # the weight of the cell left (the one entered going forward).
+        leave_cost = weights[current] if side else 0
+        for next_node in neighbors(current):
+            new_cost = current_cost + (leave_cost if side else weights[next_node])
+            mark = came_from[next_node]
+            if not mark & own_mask or new_cost < cost_so_far[next_node]:
+                cost_so_far[next_node] = new_cost
+                came_from[next_node] = (mark & other_mask) | (encode[current - next_node] << shift)
+                heapq.heappush(frontier, (new_cost, next_node))
+                if events:
+                    yield PUSH, next_node
+
+                if mark & other_mask:
+                    total = new_cost + other_cost[next_node]
+                    if best_cost is None or total < best_cost:
+                        best_cost = total
+                        meeting_point = next_node
+
+    if meeting_point == UNREACHED:
+        return [], NodeSet(grid, visited)
+    if events:
+        yield FOUND, meeting_point
+    path = reconstruct_bidirectional(grid, came_from, came_from, meeting_point, (0, CODE_BITS))
+    return path, NodeSet(grid, visited)
+
+
+def bidirectional_ucs_search(grid, start, goal, visualizer=None, delay=50):
+    """
+    Bidirectional Uniform Cost Search that finds the cheapest path under Grid.cost.
+
+    Args:
+        grid: Grid object containing the environment
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        visualizer: GridVisualizer object for visualization (optional)
+        delay: Delay in milliseconds between visualization steps
+
+    Returns:
+        path: List of tuples representing the path from start to goal
+        visited: Set of tuples representing all settled nodes
+    """
+    steps = bidirectional_ucs_steps(grid, start, goal, events=visualizer is not None)
+    return _drive(steps, start, goal, visualizer, delay)
+
+
+def _depth_first(neighbors, root, goal_id, depth_limit, depths, unseen, came_from, visited, events, stamps=None, iteration=0, distance=None):
+    """
+    One depth-limited DFS pass over a best-depth table; shared by DLS and IDDFS.
+
+    A node is pushed only when it is reached shallower than its recorded
+    depth, so re-opening happens exactly when a shorter branch shows up and
+    nodes on the current branch (always shallower) are never re-entered.
+    With ``stamps`` the depth table is treated as already exact from earlier
+    passes: equal-depth nodes are re-entered once per ``iteration`` instead
+    of being skipped. With ``distance`` (a lower bound on the moves from a
+    node to the goal) nodes that cannot reach the goal within the limit are
+    never entered.
+
+    Returns:
+        found: Whether the goal was popped
+        expanded: Number of nodes expanded
+        cutoff: Whether a node at the limit still had unreached neighbors
+    """
+    stack = [(root, depths[root])]
+    if stamps is not None:
+        stamps[root] = iteration
+    if events:
+        yield PUSH, root
+
+    expanded = 0
+    cutoff = False
+    while stack:
+        current, depth = stack.pop()
+        if events:
+            yield POP, current
+        if depth > depths[current]:
+            # Stale entry: the node was re-opened from a shallower branch.
+            continue
+
+        expanded += 1
+        if events:
+            yield EXPAND, current
+
+        if current == goal_id:
+            if events:
+                yield FOUND, current
+            return True, expanded, cutoff
+
+        if depth >= depth_limit:
+            if not cutoff:
+                for next_node in neighbors(current):
+                    if depths[next_node] == unseen:
+                        cutoff = True
+                        break
+            continue
+
+        next_depth = depth + 1
+        for next_node in neighbors(current):
+            known = depths[next_node]
+            if next_depth > known or (next_depth == known and (stamps is None or stamps[next_node] == iteration)):
+                continue
+            if distance is not None and next_depth + distance(next_node, goal_id) > depth_limit:
+                continue
+            if next_depth < known:
+                depths[next_node] = next_depth
+                came_from[next_node] = current
+            if stamps is not None:
+                stamps[next_node] = iteration
+            stack.append((next_node, next_depth))
+            if events:
+                yield PUSH, next_node
+                if not visited[next_node]:
+                    visited[next_node] = 1
+                    yield VISIT, next_node
+            else:
+                visited[next_node] = 1
+
+    return False, expanded, cutoff
+
+
+def iddfs_steps(grid, start, goal, max_depth=None, events=True):
+    """
+    Step engine for Iterative Deepening DFS; see bfs_steps for the protocol.
+
+    Each iteration restarts a depth-first pass from ``start`` with the limit
+    raised by one, but the best-depth table is kept between iterations.
+    After the pass with limit L every cell within L moves holds its exact
+    depth, so later passes only follow shortest-depth edges and enter each
+    cell once. The search stops as soon as an iteration hits no cutoff.
+
+    Returns:
+        path: List of tuples representing the path from start to goal
+        visited: Set of tuples representing all visited nodes
+        depth_found: Depth limit the goal was found at, or None
+        iterations: List of per-iteration dictionaries with depth_limit,
+            expanded and cutoff
+    """
+    start_id = grid.node_id(start)
+    goal_id = grid.node_id(goal)
+    neighbors = grid.neighbor_lookup()
+    if max_depth is None:
+        max_depth = grid.size
+
+    came_from = new_parents(grid, start_id)
+    depths, unseen = new_depths(grid, start_id, max_depth)
+    stamps = array(depths.typecode, [unseen]) * grid.size
+    visited = bytearray(grid.size)
+    visited[start_id] = 1
+    if events:
+        yield VISIT, start_id
+
+    iterations = []
+    depth_found = None
+    for depth_limit in range(max_depth + 1):
+        found, expanded, cutoff = yield from _depth_first(
+            neighbors, start_id, goal_id, depth_limit, depths, unseen,
+            came_from, visited, events, stamps, depth_limit,
+        )
+        iterations.append({"depth_limit": depth_limit, "expanded": expanded, "cutoff": cutoff})
+        if found:
+            depth_found = depth_limit
+            break
+        if not cutoff:
+            break
+
+    path = build_path(grid, came_from, goal_id) if depth_found is not None else []
+    return path, NodeSet(grid, visited), depth_found, iterations
+
+
+def run_iddfs(grid, start, goal, visualizer=None, delay=50, stats=None):
+    """
+    Run iterative deepening DFS and return path/visited/depth_found.
+
+    Paths have the fewest moves. Pass a list as ``stats`` to receive the
+    per-iteration dictionaries (depth_limit, expanded, cutoff).
+    """
+    steps = iddfs_steps(grid, start, goal, events=visualizer is not None)
+    path, visited, depth_found, iterations = _drive(steps, start, goal, visualizer, delay)
+    if stats is not None:
+        stats.extend(iterations)
+    return path, visited, depth_found
+
+
+def path_cost(grid, path):
+    """Total Grid.cost of a path of (x, y) tuples; the start cell is free."""
+    return sum(grid.cost(cell) for cell in path[1:])
+
+
+def search_by_name(algorithm, grid, start, goal, depth_limit=None, visualizer=None, prune=False):
+    """
+    Run a search by its setup-screen name, without visualization by default.
+
+    Args:
+        algorithm: One of "bfs", "dfs", "ucs", "dls", "iddfs", "bidirectional",
+            "bidirectional_ucs", "astar", "weighted_astar", "dstar_lite"
+        grid: Grid object containing the environment
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        depth_limit: Maximum depth, required for "dls"
+        visualizer: Optional object whose play(steps, start, goal, delay)
+            drives the step engine, e.g. search_trace.TraceWriter; it runs
+            with no delay
+        prune: Let "dls" skip branches that cannot reach the goal within
+            the limit (see dls_steps); ignored by the other algorithms
+
+    Returns:
+        path: List of tuples representing the path from start to goal
+        visited: Set of tuples representing all visited nodes
+    """
+    if algorithm == "bfs":
+        return bfs_search(grid, start, goal, visualizer, 0)
+    if algorithm == "dfs":
+        return dfs_search(grid, start, goal, visualizer, 0)
+    if algorithm == "ucs":
+        return ucs_search(grid, start, goal, visualizer, 0)
+    if algorithm == "dls":
+        if depth_limit is None:
+            raise ValueError("DLS requires a depth limit")
+        return dls_search(grid, start, goal, depth_limit, visualizer, 0, prune=prune)
+    if algorithm == "iddfs":
+        path, visited, _ = run_iddfs(grid, start, goal, visualizer, 0)
+        return path, visited
+    if algorithm == "bidirectional":
+        return bidirectional_search(grid, start, goal, visualizer, 0)
+    if algorithm == "bidirectional_ucs":
+        return bidirectional_ucs_search(grid, start, goal, visualizer, 0)
+    if algorithm == "astar":
+        return astar_search(grid, start, goal, visualizer, 0)
+    if algorithm == "weighted_astar":
+        return astar_search(grid, start, goal, visualizer, 0, weight=WEIGHTED_ASTAR_FACTOR)
+    if algorithm == "dstar_lite":
+        # incremental imports this module, so load it on first use.
+        from incremental import DStarLite
+
+        planner = DStarLite(grid, start, goal)
         if visualizer:
-            visualizer.draw_grid(
-                path=None,
-                start=start,
-                goal=goal,
-                visited=set(came_f.keys()) | set(came_b.keys()),
-                current=current_f if frontier_f else current_b,
-                frontier=list(frontier_f) + list(frontier_b)
-            )
-            visualizer.delay(delay)
-    
-    return [], set()
\ No newline at end of file
+            return visualizer.play(planner.replan_steps(), start, goal, 0)
+        return planner.replan()
+    raise ValueError(f"Unknown algorithm: {algorithm!r}")
+
+
+def shortest_path_tree(grid, source, targets=None, weighted=False, reverse=False):
+    """
+    Grow a single shortest-path tree from ``source`` until all targets are settled.
+
+    Args:
+        grid: Grid object containing the environment
+        source: Node id the tree is rooted at
+        targets: Iterable of node ids to settle before stopping (None grows
+            the tree over the whole reachable area)
+        weighted: Order by Grid.cost like UCS instead of by move count like BFS
+        reverse: Follow moves backwards, so costs measure the way from each
+            node *to* the source and parents point towards the source
+
+    Returns:
+        came_from: Parent table (see new_parents)
+        cost_so_far: Array of path costs, valid wherever came_from is set
+        expanded: Number of nodes taken off the frontier
+    """
+    neighbors = grid.neighbor_lookup()
+    weights = grid.weight_map
+    came_from = new_parents(grid, source)
+    cost_so_far = array("q", [0]) * grid.size
+
+    pending = bytearray(grid.size)
+    remaining = 0
+    if targets is not None:
+        for node in targets:
+            if not pending[node]:
+                pending[node] = 1
+                remaining += 1
+        if pending[source]:
+            pending[source] = 0
+            remaining -= 1
+    expanded = 0
+
+    if not weighted:
+        frontier = deque([source])
+        while frontier and (targets is None or remaining):
+            current = frontier.popleft()
+            expanded += 1
+            next_cost = cost_so_far[current] + 1
+            for next_node in neighbors(current):
+                if came_from[next_node] == UNREACHED:
+                    came_from[next_node] = current
+                    cost_so_far[next_node] = next_cost
+                    frontier.append(next_node)
+                    if pending[next_node]:
+                        remaining -= 1
+        return came_from, cost_so_far, expanded
+
+    settled = bytearray(grid.size)
+    frontier = [(0, source)]
+    while frontier and (targets is None or remaining):
+        current_cost, current = heapq.heappop(frontier)
+        if settled[current]:
+            continue
+        settled[current] = 1
+        expanded += 1
+        if pending[current]:
+            remaining -= 1
+
+        # Reversed moves pay for the cell being left instead of the one entered.
+        # The move set is symmetric, so neighbors double as predecessors.
+        leave_cost = current_cost + weights[current]
+        for next_node in neighbors(current):
+            new_cost = leave_cost if reverse else current_cost + weights[next_node]
+            if came_from[next_node] == UNREACHED or new_cost < cost_so_far[next_node]:
+                cost_so_far[next_node] = new_cost
+                came_from[next_node] = current
+                heapq.heappush(frontier, (new_cost, next_node))
+    return came_from, cost_so_far, expanded
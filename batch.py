@@ -0,0 +1,148 @@
+"""
+Answer many (start, goal) queries against one Grid with shared search trees.
+
+Queries that share a start (or a goal) are answered from a single
+shortest-path tree instead of one search each, and the groups can be spread
+over a concurrent.futures thread or process pool.
+"""
+
+import os
+import time
+
+from algorithms import build_path, shortest_path_tree
+
+# Algorithms batch_search can answer, mapped to shortest_path_tree's weighting.
+BATCH_ALGORITHMS = {"bfs": False, "ucs": True}
+
+
+def group_queries(queries, by_goal=False):
+    """
+    Group query indices by their shared endpoint.
+
+    Returns:
+        groups: List of (root, [(query_index, other_endpoint), ...]) in first-seen order
+    """
+    groups = {}
+    for index, (start, goal) in enumerate(queries):
+        root, other = (goal, start) if by_goal else (start, goal)
+        groups.setdefault(root, []).append((index, other))
+    return list(groups.items())
+
+
+def solve_group(grid, algorithm, root, members, reverse=False):
+    """
+    Answer every query of one group from a single search tree.
+
+    Returns:
+        answers: List of (query_index, path, cost); unreachable goals and
+            walled endpoints get ([], None)
+        expanded: Number of nodes the tree expanded
+    """
+    walls = grid.wall_map
+    root_id = grid.node_id(root)
+    if walls[root_id]:
+        # A tree grown from a walled root would hand out paths that start or
+        # end inside the wall.
+        return [(index, [], None) for index, _ in members], 0
+    target_ids = [grid.node_id(other) for _, other in members]
+    came_from, cost_so_far, expanded = shortest_path_tree(
+        grid,
+        root_id,
+        # Walled targets are never settled, so waiting for them would grow
+        # the tree over the whole reachable area.
+        targets=[target for target in target_ids if not walls[target]],
+        weighted=BATCH_ALGORITHMS[algorithm],
+        reverse=reverse,
+    )
+
+    answers = []
+    for (index, _), target in zip(members, target_ids):
+        path = [] if walls[target] else build_path(grid, came_from, target)
+        if not path:
+            answers.append((index, [], None))
+            continue
+        if reverse:
+            # Reverse trees are rooted at the goal, so the walk comes out goal -> start.
+            path.reverse()
+        answers.append((index, path, cost_so_far[target]))
+    return answers, expanded
+
+
+def _solve_chunk(grid, algorithm, chunk, reverse):
+    answers = []
+    expanded = 0
+    for root, members in chunk:
+        group_answers, group_expanded = solve_group(grid, algorithm, root, members, reverse)
+        answers.extend(group_answers)
+        expanded += group_expanded
+    return answers, expanded
+
+
+def batch_search(grid, queries, algorithm="bfs", executor=None, chunks=None, allow_reverse=True):
+    """
+    Answer a batch of (start, goal) queries with one search tree per group.
+
+    Queries are grouped by start, or by goal when that gives fewer groups and
+    ``allow_reverse`` is set (goal groups grow the tree over reversed moves,
+    which keeps weighted costs exact). Paths are shortest, but ties may be
+    broken differently from bfs_search/ucs_search. Queries with a walled
+    start or goal have no path in either grouping.
+
+    Args:
+        grid: Grid object containing the environment
+        queries: Sequence of ((x, y) start, (x, y) goal) pairs
+        algorithm: "bfs" (move counts) or "ucs" (Grid.cost weights)
+        executor: Optional concurrent.futures executor to spread groups over;
+            process pools receive one pickled copy of the grid per chunk
+        chunks: How many chunks to cut the groups into for the executor
+            (default: four per CPU)
+        allow_reverse: Allow grouping by goal
+
+    Returns:
+        results: List of (path, cost) in query order; ([], None) when unreachable
+            or when either endpoint is a wall
+        stats: Dictionary with queries, groups, expanded, seconds,
+            queries_per_second and ms_per_query
+    """
+    if algorithm not in BATCH_ALGORITHMS:
+        raise ValueError(f"Unsupported batch algorithm: {algorithm!r}")
+
+    queries = list(queries)
+    start_time = time.perf_counter()
+
+    groups = group_queries(queries)
+    reverse = False
+    if allow_reverse:
+        goal_groups = group_queries(queries, by_goal=True)
+        if len(goal_groups) < len(groups):
+            groups = goal_groups
+            reverse = True
+
+    results = [([], None)] * len(queries)
+    expanded = 0
+    if executor is None:
+        outcomes = [_solve_chunk(grid, algorithm, groups, reverse)]
+    else:
+        chunk_count = max(1, min(len(groups), chunks or (os.cpu_count() or 1) * 4))
+        futures = [
+            executor.submit(_solve_chunk, grid, algorithm, groups[i::chunk_count], reverse)
+            for i in range(chunk_count)
+        ]
+        outcomes = [future.result() for future in futures]
+
+    for answers, chunk_expanded in outcomes:
+        expanded += chunk_expanded
+        for index, path, cost in answers:
+            results[index] = (path, cost)
+
+    seconds = time.perf_counter() - start_time
+    stats = {
+        "queries": len(queries),
+        "groups": len(groups),
+        "grouped_by": "goal" if reverse else "start",
+        "expanded": expanded,
+        "seconds": seconds,
+        "queries_per_second": len(queries) / seconds if seconds > 0 else float("inf"),
+        "ms_per_query": seconds * 1000 / len(queries) if queries else 0.0,
+    }
+    return results, stats
@@ -0,0 +1,93 @@
+"""
+Measure HPA* build, query and wall-update times against flat A*.
+
+Run from the project root:
+    python -m benchmarks.hierarchy --size 1000 --density 0 --weights 1-1
+    python -m benchmarks.hierarchy --size 4000 --cluster-size 16 --no-flat
+"""
+
+import argparse
+import random
+import time
+
+from algorithms import astar_search, path_cost
+from benchmarks.suite import generate_grid, parse_weight_range, random_queries
+from hierarchy import Hierarchy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000, help="Grid width and height")
+    parser.add_argument("--density", type=float, default=0.0, help="Fraction of wall cells")
+    parser.add_argument("--weights", type=parse_weight_range, default=(1, 1), help="Cell weight range, e.g. 1-10")
+    parser.add_argument("--cluster-size", type=int, default=16, help="Cluster side length in cells")
+    parser.add_argument("--lazy", action="store_true", help="Compute intra-cluster edges on first use")
+    parser.add_argument("--queries", type=int, default=20, help="Random queries to time")
+    parser.add_argument("--updates", type=int, default=20, help="Single-wall toggles to time")
+    parser.add_argument("--no-flat", action="store_true", help="Skip the flat A* comparison")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    grid = generate_grid(args.size, args.density, args.weights, args.seed)
+    queries = random_queries(grid, args.queries, args.seed)
+    print(
+        f"Grid {args.size} x {args.size}, wall density {args.density}, "
+        f"weights {args.weights[0]}-{args.weights[1]}, clusters {args.cluster_size}"
+    )
+
+    hierarchy = Hierarchy(grid, args.cluster_size, lazy=args.lazy)
+    print(
+        f"build {hierarchy.seconds:.2f} s: {hierarchy.columns * hierarchy.rows} clusters, "
+        f"{len(hierarchy.crossings)} transitions"
+    )
+
+    abstract_time = 0.0
+    refine_time = 0.0
+    flat_time = 0.0
+    ratios = []
+    for start, goal in queries:
+        start_id = grid.node_id(start)
+        goal_id = grid.node_id(goal)
+        start_time = time.perf_counter()
+        abstract, _ = hierarchy.abstract_path(start_id, goal_id)
+        abstract_time += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        path = hierarchy.refine(abstract)
+        refine_time += time.perf_counter() - start_time
+
+        if not args.no_flat:
+            start_time = time.perf_counter()
+            flat_path, _ = astar_search(grid, start, goal)
+            flat_time += time.perf_counter() - start_time
+            if bool(flat_path) != bool(path):
+                raise SystemExit(f"HPA* and A* disagree on reachability for {start} -> {goal}")
+            if flat_path:
+                optimal = path_cost(grid, flat_path)
+                ratios.append(path_cost(grid, [grid.node_pos(node) for node in path]) / optimal if optimal else 1.0)
+
+    count = len(queries)
+    print(f"query: abstract {abstract_time * 1000 / count:.1f} ms + refine {refine_time * 1000 / count:.1f} ms")
+    if not args.no_flat:
+        total = abstract_time + refine_time
+        print(f"flat A*: {flat_time * 1000 / count:.1f} ms (HPA* speedup {flat_time / total:.1f}x)")
+        if ratios:
+            print(f"path cost vs optimal: mean {sum(ratios) / len(ratios):.3f}, max {max(ratios):.3f}")
+
+    rng = random.Random(args.seed)
+    update_time = 0.0
+    rebuilt = 0
+    for _ in range(args.updates):
+        cell = (rng.randrange(args.size), rng.randrange(args.size))
+        if cell in grid.walls:
+            grid.walls.discard(cell)
+        else:
+            grid.walls.add(cell)
+        start_time = time.perf_counter()
+        rebuilt += len(hierarchy.refresh())
+        update_time += time.perf_counter() - start_time
+    if args.updates:
+        print(f"wall toggle: {update_time * 1000 / args.updates:.1f} ms, {rebuilt / args.updates:.1f} clusters rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure ALT landmark preprocessing and query speed against ucs_search.
+
+Run from the project root:
+    python -m benchmarks.landmarks --size 400 --density 0.2 --weights 1-10 --landmarks 4 8 16
+"""
+
+import argparse
+import time
+
+from algorithms import astar_search, path_cost, ucs_search
+from benchmarks.suite import generate_grid, parse_weight_range, random_queries
+from landmarks import Landmarks, alt_search
+
+
+def time_queries(search, grid, queries):
+    expanded = 0
+    start_time = time.perf_counter()
+    costs = []
+    for start, goal in queries:
+        path, visited = search(grid, start, goal)
+        expanded += len(visited)
+        costs.append(path_cost(grid, path) if path else None)
+    return time.perf_counter() - start_time, expanded, costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=400, help="Grid width and height")
+    parser.add_argument("--density", type=float, default=0.2, help="Fraction of wall cells")
+    parser.add_argument("--weights", type=parse_weight_range, default=(1, 10), help="Cell weight range, e.g. 1-10")
+    parser.add_argument("--landmarks", nargs="+", type=int, default=[4, 8, 16], help="Landmark counts to try")
+    parser.add_argument("--queries", type=int, default=50, help="Random queries per configuration")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    grid = generate_grid(args.size, args.density, args.weights, args.seed)
+    queries = random_queries(grid, args.queries, args.seed)
+    print(f"Grid {args.size} x {args.size}, wall density {args.density}, weights {args.weights[0]}-{args.weights[1]}, {len(queries)} queries")
+
+    ucs_time, ucs_expanded, ucs_costs = time_queries(ucs_search, grid, queries)
+    print(f"{'search':<12}{'prep s':>9}{'KB/lmk':>9}{'query ms':>10}{'expanded':>10}{'speedup':>9}")
+    print(f"{'ucs':<12}{'':>9}{'':>9}{ucs_time * 1000 / len(queries):>10.1f}{ucs_expanded // len(queries):>10}{1:>8.1f}x")
+
+    astar_time, astar_expanded, _ = time_queries(astar_search, grid, queries)
+    print(f"{'astar':<12}{'':>9}{'':>9}{astar_time * 1000 / len(queries):>10.1f}{astar_expanded // len(queries):>10}{ucs_time / astar_time:>8.1f}x")
+
+    for count in args.landmarks:
+        landmarks = Landmarks(grid, count)
+
+        def search(grid, start, goal):
+            return alt_search(grid, start, goal, landmarks)
+
+        alt_time, alt_expanded, alt_costs = time_queries(search, grid, queries)
+        if alt_costs != ucs_costs:
+            raise SystemExit(f"ALT with {count} landmarks returned non-optimal paths")
+        per_landmark = landmarks.nbytes / max(1, len(landmarks.nodes)) / 1024
+        print(
+            f"{f'alt k={len(landmarks.nodes)}':<12}{landmarks.seconds:>9.2f}{per_landmark:>9.0f}"
+            f"{alt_time * 1000 / len(queries):>10.1f}{alt_expanded // len(queries):>10}{ucs_time / alt_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
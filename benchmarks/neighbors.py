@@ -0,0 +1,73 @@
+"""
+Compare neighbor expansion throughput with and without the CSR adjacency index.
+
+Run from the project root:
+    python -m benchmarks.neighbors --size 400 --density 0.2
+
+Searches are timed with events off; expansions are the EXPAND events of a
+separate run, so DLS re-opening cells counts every time it does.
+"""
+
+import argparse
+import random
+import time
+
+from algorithms import search_by_name
+from benchmarks.suite import EventStats
+from grid import Grid
+
+ALGORITHMS = ["bfs", "dfs", "ucs", "dls", "bidirectional"]
+
+
+def build_grid(size, density, seed, use_adjacency):
+    rng = random.Random(seed)
+    grid = Grid(size, size, use_adjacency=use_adjacency)
+    grid.walls = {
+        (x, y)
+        for y in range(size)
+        for x in range(size)
+        if rng.random() < density
+    }
+    grid.walls.discard((0, 0))
+    # Walled-in goal so every search expands all of its reachable cells.
+    grid.walls.add((size - 1, size - 1))
+    return grid
+
+
+def run_case(algorithm, grid):
+    goal = (grid.width - 1, grid.height - 1)
+    depth_limit = grid.width + grid.height
+    start_time = time.perf_counter()
+    search_by_name(algorithm, grid, (0, 0), goal, depth_limit, prune=True)
+    elapsed = time.perf_counter() - start_time
+    stats = EventStats()
+    search_by_name(algorithm, grid, (0, 0), goal, depth_limit, visualizer=stats, prune=True)
+    return stats.expansions, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=400, help="Grid width and height")
+    parser.add_argument("--density", type=float, default=0.2, help="Fraction of wall cells")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"Grid {args.size} x {args.size}, wall density {args.density}")
+    adjacency_grid = build_grid(args.size, args.density, args.seed, use_adjacency=True)
+    start_time = time.perf_counter()
+    adjacency_grid.adjacency()
+    print(f"CSR build: {time.perf_counter() - start_time:.3f}s")
+    print(f"{'algorithm':<15}{'computed/s':>14}{'csr/s':>14}{'speedup':>10}")
+
+    plain_grid = build_grid(args.size, args.density, args.seed, use_adjacency=False)
+    for name in ALGORITHMS:
+        expansions, plain_time = run_case(name, plain_grid)
+        _, csr_time = run_case(name, adjacency_grid)
+        print(
+            f"{name:<15}{expansions / plain_time:>14,.0f}{expansions / csr_time:>14,.0f}"
+            f"{plain_time / csr_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare ucs_search priority queue backends against heapq across weight ranges.
+
+Run from the project root:
+    python -m benchmarks.queues --size 400 --density 0.2 --weights 1-1 1-10 1-255
+"""
+
+import argparse
+import time
+
+from algorithms import ucs_search
+from benchmarks.suite import generate_grid, parse_weight_range
+from queues import QUEUE_BACKENDS, select_queue
+
+
+def run_case(grid, backend, repeat):
+    goal = (grid.width - 1, grid.height - 1)
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        _, visited = ucs_search(grid, (0, 0), goal, queue=backend)
+        best = min(best, time.perf_counter() - start_time)
+    return len(visited), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=400, help="Grid width and height")
+    parser.add_argument("--density", type=float, default=0.2, help="Fraction of wall cells")
+    parser.add_argument("--weights", nargs="+", type=parse_weight_range, default=[(1, 1), (1, 10), (1, 64), (1, 255)])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"Grid {args.size} x {args.size}, wall density {args.density}")
+    header = "".join(f"{name:>12}" for name in QUEUE_BACKENDS)
+    print(f"{'weights':<10}{'auto':>10}{header}   (ms, speedup vs heapq)")
+
+    for weight_range in args.weights:
+        grid = generate_grid(args.size, args.density, weight_range, args.seed)
+        grid.walls.discard((0, 0))
+        # Walled-in goal so every search settles all of its reachable cells.
+        grid.walls.add((args.size - 1, args.size - 1))
+
+        times = {name: run_case(grid, name, args.repeat)[1] for name in QUEUE_BACKENDS}
+        cells = "".join(
+            f"{times[name] * 1000:>7.0f}/{times['heapq'] / times[name]:.1f}x" for name in QUEUE_BACKENDS
+        )
+        print(f"{weight_range[0]}-{weight_range[1]:<8}{select_queue(grid):>10}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Benchmark every search algorithm on generated, MovingAI or bitmap maps.
+
+Run from the project root:
+    python -m benchmarks.suite --sizes 50 200 --densities 0 0.2 --weights 1-1 1-10
+    python -m benchmarks.suite --json results.json
+    python -m benchmarks.suite --compare results.json
+    python -m benchmarks.suite --map maps/arena.map --scen maps/arena.map.scen
+
+Each query is timed with events off. A second pass counts expansions and
+the peak frontier size from the event stream, and a third pass measures
+peak memory with tracemalloc.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from algorithms import EXPAND, POP, PUSH, path_cost, search_by_name
+from grid import Grid
+from maps import load_map, load_movingai_scen
+
+ALGORITHMS = ["bfs", "dfs", "ucs", "dls", "iddfs", "bidirectional", "bidirectional_ucs", "astar", "weighted_astar"]
+
+# Largest side length each algorithm is run on by default; the exhaustive
+# depth-first searches become impractical well before 4000 x 4000.
+DEFAULT_SIZE_CAPS = {"dls": 1000, "iddfs": 200}
+
+RESULT_FORMAT_VERSION = 1
+
+
+class EventStats:
+    """
+    Stand-in visualizer that counts search events instead of drawing them.
+
+    Expansions are EXPAND events; POP only shrinks the frontier, since the
+    lazy-deletion searches also pop stale entries they never expand.
+    """
+
+    def __init__(self):
+        self.expansions = 0
+        self.peak_frontier = 0
+
+    def play(self, steps, start, goal, delay):
+        frontier = 0
+        while True:
+            try:
+                kind, _ = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            if kind == PUSH:
+                frontier += 1
+                if frontier > self.peak_frontier:
+                    self.peak_frontier = frontier
+            elif kind == POP:
+                frontier -= 1
+            elif kind == EXPAND:
+                self.expansions += 1
+
+
+def generate_grid(size, density, weight_range, seed):
+    """
+    Build a square grid with random walls and uniform random weights.
+
+    Walls and weights come from random bytes mapped through translation
+    tables, so even 4000 x 4000 maps are generated without per-cell Python work.
+    """
+    rng = random.Random(seed)
+    grid = Grid(size, size)
+
+    threshold = round(density * 256)
+    wall_table = bytes(1 if value < threshold else 0 for value in range(256))
+    grid.wall_map[:] = rng.randbytes(grid.size).translate(wall_table)
+    grid.touch_walls()
+
+    low, high = weight_range
+    span = high - low + 1
+    weight_table = bytes(low + value % span for value in range(256))
+    grid.weight_map[:] = rng.randbytes(grid.size).translate(weight_table)
+    grid.touch_weights()
+    return grid
+
+
+def random_queries(grid, count, seed):
+    """Pick ``count`` (start, goal) pairs of distinct open cells."""
+    rng = random.Random(seed)
+    queries = []
+    attempts = 0
+    while len(queries) < count and attempts < count * 1000:
+        attempts += 1
+        start = grid.node_pos(rng.randrange(grid.size))
+        goal = grid.node_pos(rng.randrange(grid.size))
+        if start != goal and grid.is_passable(start) and grid.is_passable(goal):
+            queries.append((start, goal))
+    return queries
+
+
+def run_algorithm(algorithm, grid, start, goal, visualizer=None):
+    depth_limit = grid.width + grid.height
+    # Pruned DLS; plain re-opening DLS is impractical on these map sizes.
+    return search_by_name(algorithm, grid, start, goal, depth_limit, visualizer, prune=True)
+
+
+def measure(algorithm, grid, start, goal, repeat=1, memory=True):
+    """Benchmark one query and return its result record."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        path, visited = run_algorithm(algorithm, grid, start, goal)
+        seconds = min(seconds, time.perf_counter() - start_time)
+
+    stats = EventStats()
+    run_algorithm(algorithm, grid, start, goal, visualizer=stats)
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        run_algorithm(algorithm, grid, start, goal)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "algorithm": algorithm,
+        "start": list(start),
+        "goal": list(goal),
+        "found": bool(path),
+        "path_length": len(path),
+        "cost": path_cost(grid, path) if path else None,
+        "visited": len(visited),
+        "seconds": seconds,
+        "expansions": stats.expansions,
+        "expansions_per_sec": stats.expansions / seconds if seconds > 0 else None,
+        "peak_frontier": stats.peak_frontier,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def parse_weight_range(text):
+    low, _, high = text.partition("-")
+    low = int(low)
+    high = int(high or low)
+    if not 0 <= low <= high <= 255:
+        raise argparse.ArgumentTypeError(f"weight range must be LOW-HIGH within 0-255, got {text!r}")
+    return (low, high)
+
+
+def build_cases(args):
+    """Yield (map_name, grid, queries, extra) for every configured map."""
+    if args.map:
+        grid = load_map(args.map)
+        if args.scen:
+            scenarios = load_movingai_scen(args.scen)[:args.scen_limit]
+            queries = [(s["start"], s["goal"]) for s in scenarios]
+            extra = [{"bucket": s["bucket"], "movingai_optimal": s["optimal"]} for s in scenarios]
+        else:
+            queries = random_queries(grid, args.queries, args.seed)
+            extra = [{} for _ in queries]
+        yield args.map, grid, queries, extra
+        return
+
+    for size in args.sizes:
+        for density in args.densities:
+            for weight_range in args.weights:
+                name = f"gen-{size}x{size}-d{density:g}-w{weight_range[0]}-{weight_range[1]}"
+                grid = generate_grid(size, density, weight_range, args.seed)
+                queries = random_queries(grid, args.queries, args.seed)
+                yield name, grid, queries, [{} for _ in queries]
+
+
+def run_suite(args):
+    results = []
+    for map_name, grid, queries, extra in build_cases(args):
+        for algorithm in args.algorithms:
+            cap = DEFAULT_SIZE_CAPS.get(algorithm)
+            if cap and not args.no_caps and max(grid.width, grid.height) > cap:
+                print(f"{map_name:<34} {algorithm:<14} skipped (above {cap} cells per side)")
+                continue
+            for index, (start, goal) in enumerate(queries):
+                record = measure(algorithm, grid, start, goal, args.repeat, not args.no_memory)
+                record.update({"map": map_name, "width": grid.width, "height": grid.height, "query": index})
+                record.update(extra[index])
+                results.append(record)
+                print_record(record)
+    return results
+
+
+def print_record(record):
+    memory = record["peak_memory_bytes"]
+    memory_text = f"{memory / 1e6:>8.1f}MB" if memory is not None else f"{'-':>10}"
+    rate = record["expansions_per_sec"]
+    print(
+        f"{record['map']:<34} {record['algorithm']:<14} q{record['query']:<3}"
+        f"{record['seconds'] * 1000:>10.2f}ms"
+        f"{rate or 0:>14,.0f}/s"
+        f"{record['peak_frontier']:>10}"
+        f"{memory_text}"
+        f"  path {record['path_length']}"
+    )
+
+
+def record_key(record):
+    return (record["map"], record["algorithm"], record["query"])
+
+
+def compare(results, baseline_path, tolerance):
+    """Print per-query time ratios against a saved run; return the regression count."""
+    with open(baseline_path, "r", encoding="utf-8") as handle:
+        baseline = {record_key(record): record for record in json.load(handle)["results"]}
+
+    regressions = 0
+    print(f"\nComparison against {baseline_path} (tolerance {tolerance:.0%})")
+    for record in results:
+        old = baseline.get(record_key(record))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = record["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{record['map']:<34} {record['algorithm']:<14} q{record['query']:<3} {ratio:>6.2f}x{flag}")
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=ALGORITHMS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 100, 200], help="Grid side lengths (50-4000)")
+    parser.add_argument("--densities", nargs="+", type=float, default=[0.0, 0.2], help="Wall densities")
+    parser.add_argument("--weights", nargs="+", type=parse_weight_range, default=[(1, 1), (1, 10)], help="Weight ranges as LOW-HIGH")
+    parser.add_argument("--queries", type=int, default=3, help="Random queries per map")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per query (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--no-caps", action="store_true", help="Run DLS/IDDFS on every size")
+    parser.add_argument("--map", help="MovingAI .map or PBM/PGM bitmap to use instead of generated maps")
+    parser.add_argument("--scen", help="MovingAI .scen file with the queries for --map")
+    parser.add_argument("--scen-limit", type=int, default=20, help="Scenarios to run from --scen")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    if args.scen and not args.map:
+        parser.error("--scen requires --map")
+
+    print(f"{'map':<34} {'algorithm':<14} {'q':<4}{'time':>10}{'expansions':>16}{'frontier':>10}{'memory':>10}")
+    results = run_suite(args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "version": RESULT_FORMAT_VERSION,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                handle,
+                indent=2,
+            )
+        print(f"Wrote {len(results)} results to {args.json}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
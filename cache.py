@@ -0,0 +1,100 @@
+"""Memoized search results for repeated queries on an unchanged Grid."""
+
+from collections import OrderedDict
+import sys
+import time
+
+from algorithms import path_cost, search_by_name
+
+# Rough per-entry bookkeeping cost (key tuple, OrderedDict link, stats dict).
+_ENTRY_OVERHEAD = 600
+_CELL_TUPLE_SIZE = sys.getsizeof((0, 0))
+
+
+def _entry_size(path):
+    return _ENTRY_OVERHEAD + sys.getsizeof(path) + len(path) * _CELL_TUPLE_SIZE
+
+
+class PathCache:
+    """
+    Bounded LRU cache of (path, cost, stats) results for one Grid.
+
+    Entries are keyed by (algorithm, start, goal, depth_limit). The whole
+    cache is dropped as soon as ``grid.version`` moves, i.e. after any wall
+    or weight edit, so a hit never returns a path computed on an older map.
+    """
+
+    def __init__(self, grid, maxsize=4096, max_bytes=64 * 1024 * 1024):
+        self.grid = grid
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = grid.version
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._version = self.grid.version
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "version": self._version,
+        }
+
+    def search(self, algorithm, start, goal, depth_limit=None):
+        """
+        Return a cached or freshly computed result for one query.
+
+        Args:
+            algorithm: Setup-screen algorithm name (see search_by_name)
+            start: Tuple (x, y) representing start position
+            goal: Tuple (x, y) representing goal position
+            depth_limit: Maximum depth, only used by "dls"
+
+        Returns:
+            path: List of tuples representing the path from start to goal
+            cost: Total Grid.cost of the path, or None when no path exists
+            stats: Dictionary with visited and seconds of the original search;
+                a fresh copy on every call
+        """
+        if self.grid.version != self._version:
+            self.clear()
+
+        key = (algorithm, start, goal, depth_limit if algorithm == "dls" else None)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            path, cost, stats, _ = entry
+            return list(path), cost, dict(stats)
+
+        self.misses += 1
+        start_time = time.perf_counter()
+        path, visited = search_by_name(algorithm, self.grid, start, goal, depth_limit)
+        stats = {"visited": len(visited), "seconds": time.perf_counter() - start_time}
+        cost = path_cost(self.grid, path) if path else None
+
+        stored = tuple(path)
+        size = _entry_size(stored)
+        if size <= self.max_bytes:
+            self._entries[key] = (stored, cost, stats, size)
+            self._bytes += size
+            self._evict()
+        # Copies, like the path, so callers cannot edit the cached entry.
+        return path, cost, dict(stats)
+
+    def _evict(self):
+        entries = self._entries
+        while entries and (len(entries) > self.maxsize or self._bytes > self.max_bytes):
+            _, (_, _, _, size) = entries.popitem(last=False)
+            self._bytes -= size
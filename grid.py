@@ -1,37 +1,323 @@
 # grid.py
 
+from array import array
+from collections.abc import MutableMapping, MutableSet, Set
+from itertools import compress
+
+# Cost of entering a cell that has no explicit weight.
+DEFAULT_COST = 1
+
+# Maps every weight byte to 1 except the default cost, for fast scans.
+_NON_DEFAULT = bytes(0 if value == DEFAULT_COST else 1 for value in range(256))
+
+
 class Grid:
-    def __init__(self, width, height):
+    """
+    Rectangular grid world stored as flat per-cell buffers.
+
+    Cells can be addressed as (x, y) tuples or as integer node ids
+    (y * width + x). Walls live in ``wall_map`` (one byte per cell, 1 = wall)
+    and move costs in ``weight_map`` (one uint8 per cell). The ``walls`` and
+    ``weights`` attributes keep the original set/dict API as thin views over
+    those buffers, while the search code works on node ids directly.
+
+    Setting ``use_adjacency`` makes searches read neighbors from a
+    precomputed CSR index (see ``adjacency``) instead of computing them on
+    every expansion.
+
+    ``version`` increases on every wall or weight change made through the
+    grid API, so caches can tell when their results went stale. Code that
+    writes ``wall_map`` or ``weight_map`` directly must call ``touch_walls``
+    or ``touch_weights`` afterwards.
+    """
+
+    def __init__(self, width, height, use_adjacency=False):
         self.width = width
         self.height = height
-        self.walls = set()
-        self.weights = {}
+        self.size = width * height
+        self.wall_map = bytearray(self.size)
+        self.weight_map = bytearray([DEFAULT_COST]) * self.size
+        self.use_adjacency = use_adjacency
+        self.version = 0
+        self.walls_version = 0
+        self.weights_version = 0
+        self._adjacency = None
+
+    def __getstate__(self):
+        # The adjacency index is a cache; receivers rebuild it on demand.
+        state = self.__dict__.copy()
+        state["_adjacency"] = None
+        return state
+
+    @property
+    def walls(self):
+        return WallSet(self)
+
+    @walls.setter
+    def walls(self, cells):
+        cells = list(cells)
+        self.wall_map[:] = bytes(self.size)
+        for cell in cells:
+            self.wall_map[self._checked_id(cell)] = 1
+        self.touch_walls()
+
+    @property
+    def weights(self):
+        return WeightMap(self)
+
+    @weights.setter
+    def weights(self, mapping):
+        items = list(dict(mapping).items())
+        self.weight_map[:] = bytearray([DEFAULT_COST]) * self.size
+        for cell, weight in items:
+            self.weight_map[self._checked_id(cell)] = weight
+        self.touch_weights()
+
+    def node_id(self, id):
+        (x, y) = id
+        return y * self.width + x
+
+    def node_pos(self, node):
+        y, x = divmod(node, self.width)
+        return (x, y)
+
+    def _checked_id(self, id):
+        if not self.in_bounds(id):
+            raise ValueError(f"Cell {id} is outside the {self.width} x {self.height} grid")
+        return self.node_id(id)
 
     def cost(self, to_node):
-        # If no random weight is set, default cost is 1
-        return self.weights.get(to_node, 1)
+        # Cells without an explicit weight cost DEFAULT_COST to enter
+        return self.weight_map[self.node_id(to_node)]
 
     def in_bounds(self, id):
         (x, y) = id
         return 0 <= x < self.width and 0 <= y < self.height
 
     def is_passable(self, id):
-        return id not in self.walls
+        return not (self.in_bounds(id) and self.wall_map[self.node_id(id)])
 
-    def get_neighbors(self, id):
-        (x, y) = id
+    def neighbor_ids(self, node):
+        """Return passable neighbor ids of ``node`` in the fixed clockwise order."""
+        width = self.width
+        walls = self.wall_map
+        y, x = divmod(node, width)
+        up = y > 0
+        down = y < self.height - 1
+        left = x > 0
+        right = x < width - 1
+
+        results = []
         # Strict Clockwise Order: Up, Right, Bottom-Right, Bottom, Left, Top-Left
-        # Note: Directions adjusted based on your updated instructions
-        results = [
-            (x, y - 1),  # Up
-            (x + 1, y),  # Right
-            (x + 1, y + 1), # Bottom-Right
-            (x, y + 1),  # Bottom
-            (x - 1, y),  # Left
-            (x - 1, y - 1)  # Top-Left
-        ]
-        
-        # Filter results that are within grid and not blocked
-        results = filter(self.in_bounds, results)
-        results = filter(self.is_passable, results)
-        return results
\ No newline at end of file
+        if up and not walls[node - width]:
+            results.append(node - width)
+        if right and not walls[node + 1]:
+            results.append(node + 1)
+        if right and down and not walls[node + width + 1]:
+            results.append(node + width + 1)
+        if down and not walls[node + width]:
+            results.append(node + width)
+        if left and not walls[node - 1]:
+            results.append(node - 1)
+        if left and up and not walls[node - width - 1]:
+            results.append(node - width - 1)
+        return results
+
+    def move_distance(self, node, other):
+        """
+        Fewest moves between two node ids on an open grid; never more than
+        the true distance once walls are added.
+
+        Bottom-Right and Top-Left are the only diagonals, so one move covers
+        both axes only when they change in the same direction.
+        """
+        y1, x1 = divmod(node, self.width)
+        y2, x2 = divmod(other, self.width)
+        dx = x2 - x1
+        dy = y2 - y1
+        if (dx >= 0) == (dy >= 0):
+            return max(abs(dx), abs(dy))
+        return abs(dx) + abs(dy)
+
+    def weight_range(self):
+        """
+        Return the (min, max) cell weight, walls included.
+
+        Byte membership tests run at memchr speed, so this is far cheaper
+        than min()/max() over the whole map.
+        """
+        weights = self.weight_map
+        low = next(weight for weight in range(256) if weight in weights)
+        high = next(weight for weight in range(255, low - 1, -1) if weight in weights)
+        return low, high
+
+    def touch_walls(self):
+        """Record a wall change so cached adjacency and results get rebuilt."""
+        self.walls_version += 1
+        self.version += 1
+
+    def touch_weights(self):
+        """Record a weight change so cached results get dropped."""
+        self.weights_version += 1
+        self.version += 1
+
+    def adjacency(self):
+        """
+        Return the CSR adjacency index for the current wall layout.
+
+        Returns:
+            offsets: array of size + 1 entries; the neighbors of node n are
+                targets[offsets[n]:offsets[n + 1]]
+            targets: array of neighbor ids in the same clockwise order as
+                neighbor_ids
+        """
+        cached = self._adjacency
+        if cached is None or cached[0] != self.walls_version:
+            neighbor_ids = self.neighbor_ids
+            offsets = array("i", [0])
+            targets = array("i")
+            for node in range(self.size):
+                targets.extend(neighbor_ids(node))
+                offsets.append(len(targets))
+            cached = (self.walls_version, offsets, targets)
+            self._adjacency = cached
+        return cached[1], cached[2]
+
+    def neighbor_lookup(self):
+        """Return a node -> neighbor ids callable, using the CSR index when enabled."""
+        if not self.use_adjacency:
+            return self.neighbor_ids
+
+        offsets, targets = self.adjacency()
+
+        def neighbors(node):
+            return targets[offsets[node]:offsets[node + 1]]
+
+        return neighbors
+
+    def get_neighbors(self, id):
+        node_pos = self.node_pos
+        return [node_pos(node) for node in self.neighbor_ids(self.node_id(id))]
+
+
+class WallSet(MutableSet):
+    """Live (x, y) set view over ``Grid.wall_map``."""
+
+    __slots__ = ("_grid",)
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    def __contains__(self, cell):
+        grid = self._grid
+        return grid.in_bounds(cell) and grid.wall_map[grid.node_id(cell)] != 0
+
+    def __iter__(self):
+        grid = self._grid
+        return map(grid.node_pos, compress(range(grid.size), grid.wall_map))
+
+    def __len__(self):
+        grid = self._grid
+        return grid.size - grid.wall_map.count(0)
+
+    def add(self, cell):
+        grid = self._grid
+        grid.wall_map[grid._checked_id(cell)] = 1
+        grid.touch_walls()
+
+    def discard(self, cell):
+        grid = self._grid
+        if grid.in_bounds(cell):
+            grid.wall_map[grid.node_id(cell)] = 0
+            grid.touch_walls()
+
+    def clear(self):
+        self._grid.walls = ()
+
+    def __repr__(self):
+        return f"WallSet({set(self)!r})"
+
+
+class WeightMap(MutableMapping):
+    """
+    Live (x, y) -> cost mapping view over ``Grid.weight_map``.
+
+    Only cells whose cost differs from DEFAULT_COST are listed, so
+    ``weights.get(cell, 1)`` keeps working as before.
+    """
+
+    __slots__ = ("_grid",)
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __getitem__(self, cell):
+        grid = self._grid
+        if grid.in_bounds(cell):
+            weight = grid.weight_map[grid.node_id(cell)]
+            if weight != DEFAULT_COST:
+                return weight
+        raise KeyError(cell)
+
+    def __setitem__(self, cell, weight):
+        grid = self._grid
+        grid.weight_map[grid._checked_id(cell)] = weight
+        grid.touch_weights()
+
+    def __delitem__(self, cell):
+        if cell not in self:
+            raise KeyError(cell)
+        grid = self._grid
+        grid.weight_map[grid.node_id(cell)] = DEFAULT_COST
+        grid.touch_weights()
+
+    def __iter__(self):
+        grid = self._grid
+        mask = grid.weight_map.translate(_NON_DEFAULT)
+        return map(grid.node_pos, compress(range(grid.size), mask))
+
+    def __len__(self):
+        grid = self._grid
+        return grid.size - grid.weight_map.count(DEFAULT_COST)
+
+    def clear(self):
+        self._grid.weights = {}
+
+    def __repr__(self):
+        return f"WeightMap({dict(self)!r})"
+
+
+class NodeSet(Set):
+    """
+    Read-only (x, y) set view over a per-cell flag buffer.
+
+    Searches return their visited nodes this way so that a full-grid
+    exploration costs one byte per cell instead of one tuple per node.
+    """
+
+    __slots__ = ("_grid", "_flags")
+
+    def __init__(self, grid, flags):
+        self._grid = grid
+        self._flags = flags
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    def __contains__(self, cell):
+        grid = self._grid
+        return grid.in_bounds(cell) and self._flags[grid.node_id(cell)] != 0
+
+    def __iter__(self):
+        return map(self._grid.node_pos, compress(range(len(self._flags)), self._flags))
+
+    def __len__(self):
+        return len(self._flags) - self._flags.count(0)
+
+    def __repr__(self):
+        return f"NodeSet({set(self)!r})"
@@ -0,0 +1,555 @@
+"""
+Hierarchical path-finding (HPA*) for very large grids.
+
+The grid is cut into square clusters. Wherever open cells face each other
+across a cluster border an entrance is placed, and its two cells become
+transition nodes of an abstract graph. Transitions of the same cluster are
+joined by edges carrying their cheapest Grid.cost inside that cluster, and
+the two cells of an entrance by a single move.
+
+A query links start and goal to the transitions of their own clusters,
+runs A* on the abstract graph and then refines each abstract edge with a
+search confined to one cluster, so only clusters on the path are searched
+cell by cell. Paths are near-optimal rather than optimal: they are forced
+through entrance cells.
+
+Wall and weight changes are picked up on the next query by diffing the
+grid against a snapshot; only clusters containing changed cells, and the
+neighbors whose shared borders changed, are rebuilt.
+
+Usage:
+    hierarchy = Hierarchy(grid, cluster_size=16)
+    path, visited = hpa_search(grid, start, goal, hierarchy)
+"""
+
+import heapq
+import time
+
+from algorithms import move_heuristic
+
+# Offset from the cluster owning a border to the cluster across it.
+_BORDER_OFFSETS = {"v": (1, 0), "h": (0, 1), "d": (1, 1)}
+
+# Default heuristic inflation for the abstract search. Abstract paths are
+# already bent through entrance cells, and a slight inflation cuts abstract
+# expansions several-fold on open maps for a percent or two of path cost.
+ABSTRACT_WEIGHT = 1.1
+
+# Entrances at least this wide get a transition at each end instead of one
+# in the middle, which keeps paths along long open borders straighter.
+LONG_ENTRANCE = 6
+
+
+class Hierarchy:
+    """
+    Abstract cluster graph over one grid.
+
+    Attributes:
+        cluster_size: Side length of a cluster in cells
+        columns, rows: Number of clusters along x and y
+        entrances: Border key -> list of (cell, cell) node id pairs; keys are
+            ("v", cx, cy) for the border between clusters (cx, cy) and
+            (cx + 1, cy), ("h", cx, cy) for (cx, cy) / (cx, cy + 1) and
+            ("d", cx, cy) for the corner move into (cx + 1, cy + 1)
+        crossings: Transition node id -> set of node ids across its borders
+        intra: Cluster id -> {transition: [(transition, cost), ...]} for the
+            clusters whose edges have been computed
+        seconds: Wall time spent building the hierarchy
+    """
+
+    def __init__(self, grid, cluster_size=16, lazy=False):
+        """
+        Build entrances and (unless ``lazy``) intra-cluster edges.
+
+        Args:
+            grid: Grid object containing the environment
+            cluster_size: Side length of a cluster in cells
+            lazy: Compute a cluster's intra edges only when a query first
+                reaches it, trading slower first queries for a fast build
+        """
+        start_time = time.perf_counter()
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.columns = -(-grid.width // cluster_size)
+        self.rows = -(-grid.height // cluster_size)
+        self.lazy = lazy
+        self.entrances = {}
+        self.crossings = {}
+        self.intra = {}
+        self._snapshot()
+
+        for cy in range(self.rows):
+            for cx in range(self.columns):
+                for key in self._own_borders(cx, cy):
+                    self._set_entrances(key, self._find_entrances(key))
+        if not lazy:
+            for cluster in range(self.columns * self.rows):
+                self._intra_edges(cluster)
+        self.seconds = time.perf_counter() - start_time
+
+    def _snapshot(self):
+        self.version = self.grid.version
+        self._walls = bytes(self.grid.wall_map)
+        self._weights = bytes(self.grid.weight_map)
+        # Lowest weight only; a full weight_range scan is slow on huge maps.
+        self.min_weight = next(weight for weight in range(256) if weight in self._weights)
+
+    def cluster_of(self, node):
+        """Return the cluster id (cy * columns + cx) holding a node id."""
+        y, x = divmod(node, self.grid.width)
+        return (y // self.cluster_size) * self.columns + x // self.cluster_size
+
+    def _bounds(self, cluster):
+        cy, cx = divmod(cluster, self.columns)
+        size = self.cluster_size
+        x0 = cx * size
+        y0 = cy * size
+        return x0, y0, min(x0 + size, self.grid.width), min(y0 + size, self.grid.height)
+
+    def _own_borders(self, cx, cy):
+        # Borders on the right, bottom and bottom-right of a cluster, so each
+        # border belongs to exactly one cluster.
+        keys = []
+        if cx + 1 < self.columns:
+            keys.append(("v", cx, cy))
+        if cy + 1 < self.rows:
+            keys.append(("h", cx, cy))
+        if cx + 1 < self.columns and cy + 1 < self.rows:
+            keys.append(("d", cx, cy))
+        return keys
+
+    def _touching_borders(self, cluster):
+        # Borders with transition cells inside the cluster.
+        cy, cx = divmod(cluster, self.columns)
+        keys = self._own_borders(cx, cy)
+        if cx > 0:
+            keys.append(("v", cx - 1, cy))
+        if cy > 0:
+            keys.append(("h", cx, cy - 1))
+        if cx > 0 and cy > 0:
+            keys.append(("d", cx - 1, cy - 1))
+        return keys
+
+    def _dependent_borders(self, cluster):
+        # Borders whose entrances read walls inside the cluster: the touching
+        # ones plus the corners beside it, which check the cells next to the
+        # corner move.
+        cy, cx = divmod(cluster, self.columns)
+        keys = self._touching_borders(cluster)
+        if cx > 0 and cy + 1 < self.rows:
+            keys.append(("d", cx - 1, cy))
+        if cy > 0 and cx + 1 < self.columns:
+            keys.append(("d", cx, cy - 1))
+        return keys
+
+    def _find_entrances(self, key):
+        kind, cx, cy = key
+        grid = self.grid
+        width = grid.width
+        walls = grid.wall_map
+        size = self.cluster_size
+
+        if kind == "d":
+            x = (cx + 1) * size - 1
+            y = (cy + 1) * size - 1
+            first = y * width + x
+            second = first + width + 1
+            # Only needed when neither cell beside the corner is open;
+            # otherwise the v and h entrances already cover the move.
+            if not walls[first] and not walls[second] and walls[first + 1] and walls[first + width]:
+                return [(first, second)]
+            return []
+
+        if kind == "v":
+            x = (cx + 1) * size - 1
+            y0 = cy * size
+            y1 = min(y0 + size, grid.height)
+            firsts = [y * width + x for y in range(y0, y1)]
+            seconds = [cell + 1 for cell in firsts]
+        else:
+            y = (cy + 1) * size - 1
+            x0 = cx * size
+            x1 = min(x0 + size, width)
+            firsts = [y * width + x for x in range(x0, x1)]
+            seconds = [cell + width for cell in firsts]
+
+        # Straight crossings form runs whose cells are connected along the
+        # border on both sides, so one transition pair stands for the run.
+        straight = [not walls[a] and not walls[b] for a, b in zip(firsts, seconds)]
+        pairs = []
+        index = 0
+        count = len(firsts)
+        while index < count:
+            if not straight[index]:
+                index += 1
+                continue
+            end = index
+            while end < count and straight[end]:
+                end += 1
+            if end - index >= LONG_ENTRANCE:
+                pairs.append((firsts[index], seconds[index]))
+                pairs.append((firsts[end - 1], seconds[end - 1]))
+            else:
+                middle = (index + end - 1) // 2
+                pairs.append((firsts[middle], seconds[middle]))
+            index = end
+
+        # A diagonal crossing (Bottom-Right) is covered by a run unless both
+        # straight crossings next to it are blocked.
+        for index in range(count - 1):
+            a = firsts[index]
+            b = seconds[index + 1]
+            if not walls[a] and not walls[b] and not straight[index] and not straight[index + 1]:
+                pairs.append((a, b))
+        return pairs
+
+    def _set_entrances(self, key, pairs):
+        crossings = self.crossings
+        for a, b in self.entrances.get(key, ()):
+            for node, other in ((a, b), (b, a)):
+                others = crossings[node]
+                others.discard(other)
+                if not others:
+                    del crossings[node]
+        for a, b in pairs:
+            crossings.setdefault(a, set()).add(b)
+            crossings.setdefault(b, set()).add(a)
+        if pairs:
+            self.entrances[key] = pairs
+        else:
+            self.entrances.pop(key, None)
+
+    def transitions(self, cluster):
+        """Return the sorted transition node ids of a cluster."""
+        nodes = set()
+        cluster_of = self.cluster_of
+        for key in self._touching_borders(cluster):
+            for pair in self.entrances.get(key, ()):
+                for node in pair:
+                    if cluster_of(node) == cluster:
+                        nodes.add(node)
+        return sorted(nodes)
+
+    def _local_map(self, cluster):
+        """
+        Copy a cluster's walls and weights into buffers padded with a ring of
+        walls, so searches inside it need no bounds checks.
+
+        Returns:
+            (x0, y0, stride, blocked, weights) where local index
+            (y - y0 + 1) * stride + (x - x0 + 1) addresses cell (x, y)
+        """
+        x0, y0, x1, y1 = self._bounds(cluster)
+        grid = self.grid
+        width = grid.width
+        span = x1 - x0
+        stride = span + 2
+        blocked = bytearray([1]) * (stride * (y1 - y0 + 2))
+        weights = bytearray(len(blocked))
+        local = stride + 1
+        for row in range(y0 * width + x0, y1 * width, width):
+            blocked[local:local + span] = grid.wall_map[row:row + span]
+            weights[local:local + span] = grid.weight_map[row:row + span]
+            local += stride
+        return x0, y0, stride, blocked, weights
+
+    def _cluster_search(self, cluster, source, targets, local=None):
+        """
+        Dijkstra from ``source`` that never leaves ``cluster``.
+
+        Stops once every node in ``targets`` is settled. Returns a dict of
+        final costs for the targets that are reachable inside the cluster.
+        """
+        if local is None:
+            local = self._local_map(cluster)
+        x0, y0, stride, blocked, weights = local
+        width = self.grid.width
+
+        def to_local(node):
+            y, x = divmod(node, width)
+            return (y - y0 + 1) * stride + x - x0 + 1
+
+        remaining = {}
+        for node in targets:
+            remaining[to_local(node)] = node
+        origin = to_local(source)
+        costs = {}
+        if origin in remaining:
+            costs[remaining.pop(origin)] = 0
+        if not remaining:
+            return costs
+
+        # Up, Right, Bottom-Right, Bottom, Left, Top-Left
+        offsets = (-stride, 1, stride + 1, stride, -1, -stride - 1)
+        best = [-1] * len(blocked)
+        best[origin] = 0
+        settled = bytearray(len(blocked))
+        frontier = [(0, origin)]
+        while frontier:
+            cost, node = heapq.heappop(frontier)
+            if settled[node]:
+                continue
+            settled[node] = 1
+            if node in remaining:
+                costs[remaining.pop(node)] = cost
+                if not remaining:
+                    break
+            for offset in offsets:
+                next_node = node + offset
+                if blocked[next_node]:
+                    continue
+                new_cost = cost + weights[next_node]
+                old_cost = best[next_node]
+                if old_cost < 0 or new_cost < old_cost:
+                    best[next_node] = new_cost
+                    heapq.heappush(frontier, (new_cost, next_node))
+        return costs
+
+    def _cluster_path(self, cluster, source, target):
+        """
+        Cheapest node id path from source (excluded) to target inside
+        ``cluster``, found with A* on the cluster's local map.
+        """
+        x0, y0, stride, blocked, weights = self._local_map(cluster)
+        width = self.grid.width
+        scale = self.min_weight
+        sy, sx = divmod(source, width)
+        ty, tx = divmod(target, width)
+        origin = (sy - y0 + 1) * stride + sx - x0 + 1
+        goal = (ty - y0 + 1) * stride + tx - x0 + 1
+        goal_y, goal_x = divmod(goal, stride)
+
+        def heuristic(node):
+            y, x = divmod(node, stride)
+            dx = goal_x - x
+            dy = goal_y - y
+            if (dx >= 0) == (dy >= 0):
+                return max(abs(dx), abs(dy)) * scale
+            return (abs(dx) + abs(dy)) * scale
+
+        offsets = (-stride, 1, stride + 1, stride, -1, -stride - 1)
+        best = [-1] * len(blocked)
+        best[origin] = 0
+        parents = [-1] * len(blocked)
+        closed = bytearray(len(blocked))
+        frontier = [(heuristic(origin), origin)]
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            if node == goal:
+                break
+            if closed[node]:
+                continue
+            closed[node] = 1
+            cost = best[node]
+            for offset in offsets:
+                next_node = node + offset
+                if blocked[next_node] or closed[next_node]:
+                    continue
+                new_cost = cost + weights[next_node]
+                old_cost = best[next_node]
+                if old_cost < 0 or new_cost < old_cost:
+                    best[next_node] = new_cost
+                    parents[next_node] = node
+                    heapq.heappush(frontier, (new_cost + heuristic(next_node), next_node))
+
+        segment = []
+        step = goal
+        while step != origin:
+            y, x = divmod(step, stride)
+            segment.append((y + y0 - 1) * width + x + x0 - 1)
+            step = parents[step]
+        segment.reverse()
+        return segment
+
+    def _intra_edges(self, cluster):
+        edges = self.intra.get(cluster)
+        if edges is not None:
+            return edges
+
+        weights = self.grid.weight_map
+        nodes = self.transitions(cluster)
+        edges = {node: [] for node in nodes}
+        local = self._local_map(cluster) if len(nodes) > 1 else None
+        for index, source in enumerate(nodes):
+            later = nodes[index + 1:]
+            if not later:
+                break
+            costs = self._cluster_search(cluster, source, later, local)
+            for target in later:
+                cost = costs.get(target)
+                if cost is not None:
+                    # Walking the same path backwards pays for the source
+                    # cell instead of the target.
+                    edges[source].append((target, cost))
+                    edges[target].append((source, cost + weights[source] - weights[target]))
+        self.intra[cluster] = edges
+        return edges
+
+    def refresh(self):
+        """
+        Bring the hierarchy up to date with wall and weight changes.
+
+        Returns:
+            Set of cluster ids whose intra edges were dropped
+        """
+        grid = self.grid
+        if self.version == grid.version:
+            return set()
+
+        wall_changes = self._changed_clusters(grid.wall_map, self._walls)
+        dirty = self._changed_clusters(grid.weight_map, self._weights) | wall_changes
+
+        borders = set()
+        for cluster in wall_changes:
+            borders.update(self._dependent_borders(cluster))
+        for key in borders:
+            pairs = self._find_entrances(key)
+            if pairs != self.entrances.get(key, []):
+                self._set_entrances(key, pairs)
+                kind, cx, cy = key
+                dirty.add(cy * self.columns + cx)
+                dx, dy = _BORDER_OFFSETS[kind]
+                dirty.add((cy + dy) * self.columns + cx + dx)
+
+        for cluster in dirty:
+            self.intra.pop(cluster, None)
+        if not self.lazy:
+            for cluster in dirty:
+                self._intra_edges(cluster)
+        self._snapshot()
+        return dirty
+
+    def _changed_clusters(self, current, snapshot):
+        clusters = set()
+        current = memoryview(current)
+        snapshot = memoryview(snapshot)
+        if current == snapshot:
+            return clusters
+        width = self.grid.width
+        size = self.cluster_size
+        for y in range(self.grid.height):
+            row = y * width
+            if current[row:row + width] == snapshot[row:row + width]:
+                continue
+            for x in range(0, width, size):
+                end = row + min(x + size, width)
+                if current[row + x:end] != snapshot[row + x:end]:
+                    clusters.add((y // size) * self.columns + x // size)
+        return clusters
+
+    def abstract_path(self, start_id, goal_id, weight=ABSTRACT_WEIGHT):
+        """
+        Run (weighted) A* on the abstract graph between two node ids.
+
+        Args:
+            start_id: Node id of the start
+            goal_id: Node id of the goal
+            weight: Heuristic inflation; 1.0 gives the cheapest path the
+                abstract graph allows
+
+        Returns:
+            path: Node ids of start, the transitions passed and goal (empty
+                when the goal is unreachable)
+            expanded: Set of abstract node ids taken off the frontier
+        """
+        self.refresh()
+        weights = self.grid.weight_map
+        crossings = self.crossings
+        cluster_of = self.cluster_of
+        intra_edges = self._intra_edges
+
+        start_cluster = cluster_of(start_id)
+        goal_cluster = cluster_of(goal_id)
+
+        # Link start and goal to the transitions of their own clusters.
+        targets = self.transitions(start_cluster)
+        if goal_cluster == start_cluster:
+            targets.append(goal_id)
+        costs = self._cluster_search(start_cluster, start_id, targets)
+        start_edges = [(node, costs[node]) for node in targets if node in costs and node != start_id]
+        start_edges.extend((node, weights[node]) for node in crossings.get(start_id, ()))
+
+        targets = self.transitions(goal_cluster)
+        costs = self._cluster_search(goal_cluster, goal_id, targets)
+        # Costs from the goal, turned around to costs towards it.
+        goal_edges = {node: costs[node] + weights[goal_id] - weights[node] for node in targets if node in costs}
+
+        heuristic = move_heuristic(self.grid, goal_id, self.min_weight)
+        start_h = heuristic(start_id) * weight
+        frontier = [(start_h, start_h, start_id)]  # (f, h, node)
+        best = {start_id: 0}
+        came_from = {start_id: None}
+        expanded = set()
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node in expanded:
+                continue
+            expanded.add(node)
+            cost = best[node]
+            if node == goal_id:
+                break
+
+            if node == start_id:
+                successors = start_edges
+            else:
+                successors = list(intra_edges(cluster_of(node)).get(node, ()))
+                successors.extend((other, weights[other]) for other in crossings.get(node, ()))
+                if node in goal_edges:
+                    successors.append((goal_id, goal_edges[node]))
+
+            for next_node, step in successors:
+                new_cost = cost + step
+                if next_node not in expanded and new_cost < best.get(next_node, new_cost + 1):
+                    best[next_node] = new_cost
+                    came_from[next_node] = node
+                    h = heuristic(next_node) * weight
+                    heapq.heappush(frontier, (new_cost + h, h, next_node))
+
+        if goal_id not in expanded:
+            return [], expanded
+        path = []
+        node = goal_id
+        while node is not None:
+            path.append(node)
+            node = came_from[node]
+        path.reverse()
+        return path, expanded
+
+    def refine(self, abstract):
+        """Expand an abstract path into the full list of node ids."""
+        if not abstract:
+            return []
+        cluster_of = self.cluster_of
+        path = [abstract[0]]
+        for node, next_node in zip(abstract, abstract[1:]):
+            cluster = cluster_of(node)
+            if cluster != cluster_of(next_node):
+                # Entrance pairs are one move apart.
+                path.append(next_node)
+                continue
+            path.extend(self._cluster_path(cluster, node, next_node))
+        return path
+
+
+def hpa_search(grid, start, goal, hierarchy, weight=ABSTRACT_WEIGHT):
+    """
+    Hierarchical search for a near-optimal path from start to goal.
+
+    Args:
+        grid: Grid object containing the environment
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        hierarchy: Hierarchy built for ``grid``
+        weight: Heuristic inflation of the abstract search
+
+    Returns:
+        path: List of tuples representing the path from start to goal
+        visited: Set of tuples representing the abstract nodes expanded
+    """
+    if hierarchy.grid is not grid:
+        raise ValueError("Hierarchy was built for a different grid")
+    if not grid.is_passable(start) or not grid.is_passable(goal):
+        return [], set()
+    abstract, expanded = hierarchy.abstract_path(grid.node_id(start), grid.node_id(goal), weight)
+    node_pos = grid.node_pos
+    return [node_pos(node) for node in hierarchy.refine(abstract)], {node_pos(node) for node in expanded}
@@ -0,0 +1,302 @@
+"""
+Incremental replanning with D* Lite.
+
+DStarLite searches backwards from the goal and keeps its g/rhs tables
+between calls. g is the cost-to-goal a node was last expanded with and
+rhs the one-step lookahead through its neighbors; nodes where the two
+disagree are queued. After walls or weights change on the Grid, or the
+agent moves the start, replan only re-expands nodes whose cost-to-goal is
+affected instead of searching from scratch.
+
+Edits go through the normal Grid API (grid.walls, grid.weights or
+wall_map/weight_map plus touch_walls/touch_weights); the planner finds the
+changed cells by diffing the grid against a snapshot.
+
+D* Lite needs every move to cost more than zero: two zero-weight cells
+would keep vouching for each other's stale cost after an edit cut them
+off. The planner therefore prices entering a cell at ``weight * unit + 1``
+with ``unit`` larger than any path's move count, which orders paths by
+weight first and breaks ties by fewer moves.
+
+Usage:
+    planner = DStarLite(grid, start, goal)
+    path, visited = planner.replan()
+    grid.walls.add((4, 2))
+    planner.move_start(path[1])
+    path, visited = planner.replan()  # repairs only what the wall affected
+"""
+
+from array import array
+import heapq
+
+from algorithms import EXPAND, FOUND, POP, PUSH, VISIT, run_steps
+from grid import NodeSet
+
+# Cost standing in for "no path"; sums with a few move costs still compare
+# above every real cost and are clamped back to it.
+INFINITY = 1 << 62
+
+
+class DStarLite:
+    """
+    D* Lite planner for one goal on one grid.
+
+    Attributes:
+        start_id: Node id the agent currently stands on
+        goal_id: Node id of the goal
+        expanded: Number of nodes expanded by the last replan
+    """
+
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.start_id = grid.node_id(start)
+        self.goal_id = grid.node_id(goal)
+        self.expanded = 0
+        self._reset()
+
+    def _reset(self):
+        grid = self.grid
+        # h must stay a lower bound for every edit, so it uses the smallest
+        # weight seen; an edit below it forces a full restart.
+        self.unit = grid.size
+        self.min_weight = grid.weight_range()[0]
+        self.scale = self.min_weight * self.unit + 1
+        self.g = array("q", [INFINITY]) * grid.size
+        self.rhs = array("q", [INFINITY]) * grid.size
+        self.rhs[self.goal_id] = 0
+        self.km = 0
+        self.last_start = self.start_id
+        self.heap = []
+        self.queued = {}  # node -> key of its live heap entry
+        self._push(self.goal_id)
+        self._snapshot()
+
+    def _snapshot(self):
+        self.version = self.grid.version
+        self._walls = bytes(self.grid.wall_map)
+        self._weights = bytes(self.grid.weight_map)
+
+    def move_start(self, start):
+        """Move the agent; the next replan accounts for the new position."""
+        self.start_id = self.grid.node_id(start)
+
+    def _heuristic(self, node, other):
+        width = self.grid.width
+        y1, x1 = divmod(node, width)
+        y2, x2 = divmod(other, width)
+        dx = x2 - x1
+        dy = y2 - y1
+        if (dx >= 0) == (dy >= 0):
+            return max(abs(dx), abs(dy)) * self.scale
+        return (abs(dx) + abs(dy)) * self.scale
+
+    def _key(self, node):
+        best = min(self.g[node], self.rhs[node])
+        return (best + self._heuristic(self.start_id, node) + self.km, best)
+
+    def _push(self, node):
+        key = self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.heap, (key[0], key[1], node))
+
+    def _top(self):
+        # Drop heap entries superseded by a later push or removal.
+        heap = self.heap
+        queued = self.queued
+        while heap:
+            k1, k2, node = heap[0]
+            if queued.get(node) == (k1, k2):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _lookahead(self, node):
+        # rhs: cheapest move into an open neighbor plus that neighbor's g.
+        if self.grid.wall_map[node]:
+            return INFINITY
+        g = self.g
+        weights = self.grid.weight_map
+        unit = self.unit
+        best = INFINITY
+        for next_node in self.grid.neighbor_ids(node):
+            cost = weights[next_node] * unit + 1 + g[next_node]
+            if cost < best:
+                best = cost
+        return best
+
+    def _update(self, node):
+        """
+        Re-queue ``node`` according to whether g and rhs now agree.
+
+        Returns PUSH or POP when its frontier membership changed, else None.
+        """
+        was_queued = self.queued.pop(node, None) is not None
+        if self.g[node] != self.rhs[node]:
+            self._push(node)
+            return None if was_queued else PUSH
+        return POP if was_queued else None
+
+    def _changed_cells(self):
+        grid = self.grid
+        width = grid.width
+        changed = set()
+        for current, snapshot in ((grid.wall_map, self._walls), (grid.weight_map, self._weights)):
+            current = memoryview(current)
+            snapshot = memoryview(snapshot)
+            if current == snapshot:
+                continue
+            for row in range(0, grid.size, width):
+                if current[row:row + width] != snapshot[row:row + width]:
+                    changed.update(node for node in range(row, row + width) if current[node] != snapshot[node])
+        return changed
+
+    def replan_steps(self, events=True):
+        """
+        Step engine that repairs the plan; see algorithms.bfs_steps for the
+        event protocol.
+
+        Yields events only for the nodes this repair touches, so a
+        visualizer shows how little of the tree an edit invalidates. Returns
+        (path, visited) with visited holding the nodes expanded this call.
+        """
+        grid = self.grid
+        if self.start_id != self.last_start:
+            # Keys queued before the move stay lower bounds once every later
+            # key is raised by how far the start moved.
+            self.km += self._heuristic(self.last_start, self.start_id)
+            self.last_start = self.start_id
+        if grid.version != self.version:
+            changed = self._changed_cells()
+            weights = grid.weight_map
+            if any(weights[node] < self.min_weight for node in changed):
+                self._reset()
+            else:
+                self._snapshot()
+                neighbor_ids = grid.neighbor_ids
+                for node in changed:
+                    for affected in [node] + neighbor_ids(node):
+                        if affected != self.goal_id:
+                            self.rhs[affected] = self._lookahead(affected)
+                        kind = self._update(affected)
+                        if events and kind is not None:
+                            yield kind, affected
+
+        g = self.g
+        rhs = self.rhs
+        weights = grid.weight_map
+        walls = grid.wall_map
+        neighbor_ids = grid.neighbor_ids
+        goal_id = self.goal_id
+        start_id = self.start_id
+        unit = self.unit
+        visited = bytearray(grid.size)
+        self.expanded = 0
+
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            k1, k2, node = top
+            if (k1, k2) >= self._key(start_id) and rhs[start_id] <= g[start_id]:
+                break
+            new_key = self._key(node)
+            if (k1, k2) < new_key:
+                # Its key grew since it was queued (the start moved).
+                self._push(node)
+                continue
+
+            heapq.heappop(self.heap)
+            del self.queued[node]
+            visited[node] = 1
+            self.expanded += 1
+            if events:
+                yield POP, node
+                yield VISIT, node
+                yield EXPAND, node
+
+            if g[node] > rhs[node]:
+                # Overconsistent: settle it and offer the cheaper way on to
+                # every neighbor that can step onto it (none can enter a
+                # walled-in goal).
+                g[node] = rhs[node]
+                through = rhs[node] + weights[node] * unit + 1
+                for previous in () if walls[node] else neighbor_ids(node):
+                    if previous != goal_id and through < rhs[previous]:
+                        rhs[previous] = through
+                        kind = self._update(previous)
+                        if events and kind is not None:
+                            yield kind, previous
+            else:
+                # Underconsistent: forget g and recompute every lookahead
+                # that may have gone through this node.
+                old = g[node] + (INFINITY if walls[node] else weights[node] * unit + 1)
+                g[node] = INFINITY
+                for previous in neighbor_ids(node) + [node]:
+                    if previous != goal_id and (previous == node or rhs[previous] == old):
+                        rhs[previous] = self._lookahead(previous)
+                    kind = self._update(previous)
+                    if events and kind is not None:
+                        yield kind, previous
+
+        path = self.path()
+        if path and events:
+            yield FOUND, start_id
+        return path, NodeSet(grid, visited)
+
+    def replan(self):
+        """Repair the plan without events; returns (path, visited)."""
+        return run_steps(self.replan_steps(events=False))
+
+    def path(self):
+        """
+        Follow the cheapest lookahead from the start to the goal.
+
+        Moves go to the neighbors that realize the lookahead, lower g first.
+        Zero-weight cells can tie with a neighbor of the same g, so the walk
+        skips cells it has already seen and backs out of dead ends instead
+        of stepping back and forth between them.
+
+        Returns:
+            List of tuples from the current start to the goal, empty when the
+            goal is unreachable
+        """
+        grid = self.grid
+        node = self.start_id
+        if grid.wall_map[node] or self.rhs[node] >= INFINITY:
+            return []
+        walk = [node]
+        seen = {node}
+        moves = [self._cheapest_moves(node)]
+        while walk[-1] != self.goal_id:
+            if not moves[-1]:
+                walk.pop()
+                moves.pop()
+                if not walk:
+                    return []
+                continue
+            node = moves[-1].pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            walk.append(node)
+            moves.append(self._cheapest_moves(node))
+        return [grid.node_pos(node) for node in walk]
+
+    def _cheapest_moves(self, node):
+        """Neighbors with the lowest weight + g, ordered so pop() gives the lowest g first."""
+        g = self.g
+        weights = self.grid.weight_map
+        unit = self.unit
+        best = INFINITY
+        moves = []
+        for next_node in self.grid.neighbor_ids(node):
+            cost = weights[next_node] * unit + 1 + g[next_node]
+            if cost < best:
+                best = cost
+                moves = [next_node]
+            elif cost == best:
+                moves.append(next_node)
+        # Stable sort keeps neighbor order among equal g; reversed for pop().
+        moves.sort(key=g.__getitem__)
+        moves.reverse()
+        return moves
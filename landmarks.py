@@ -0,0 +1,174 @@
+"""
+Landmark (ALT) preprocessing for repeated queries on a static grid.
+
+A handful of landmark cells are chosen by farthest-point selection and one
+full UCS is grown from each. For any landmark L and nodes v, t the triangle
+inequality bounds the remaining cost from both sides:
+
+    d(v, t) >= d(L, t) - d(L, v)
+    d(v, t) >= d(v, L) - d(t, L)
+
+Grid.cost charges the weight of the cell being entered, so a path walked
+backwards costs the same minus the weight of its far end plus that of its
+near end: d(v, L) = d(L, v) + w(L) - w(v). One tree per landmark therefore
+yields both bounds, and the heuristic is the largest of them over all
+landmarks. It is consistent, so A* with it returns optimal paths.
+
+Usage:
+    landmarks = Landmarks(grid, count=8)
+    path, visited = alt_search(grid, start, goal, landmarks)
+"""
+
+from array import array
+import time
+
+from algorithms import UNREACHED, astar_search, shortest_path_tree
+
+
+def _cost_typecode(grid):
+    # Unsigned 32-bit costs cover every grid below ~16.8M cells even with
+    # all weights at 255; the top value is kept free for UNREACHABLE.
+    return "I" if grid.size * 255 < 0xFFFFFFFF else "Q"
+
+
+class Landmarks:
+    """
+    Landmark cost tables for one grid layout.
+
+    Attributes:
+        nodes: Landmark node ids in selection order
+        tables: One array per landmark holding the cost from the landmark to
+            every node (``unreachable`` where no path exists)
+        seconds: Wall time spent on preprocessing
+        version: Grid.version the tables were computed at
+    """
+
+    def __init__(self, grid, count=8, origin=None):
+        """
+        Select ``count`` landmarks and compute their cost tables.
+
+        Args:
+            grid: Grid object containing the environment
+            count: Number of landmarks to place
+            origin: Tuple (x, y) the selection starts from (default: the
+                first open cell); landmarks only cover its connected area
+
+        The first landmark is the cell farthest from ``origin``; each next one
+        is the cell whose cost from the nearest chosen landmark is largest.
+        Selection stops early once every reachable cell is a landmark.
+        """
+        start_time = time.perf_counter()
+        self.grid = grid
+        self.version = grid.version
+        self.typecode = _cost_typecode(grid)
+        self.unreachable = (1 << (8 * array(self.typecode).itemsize)) - 1
+        self.nodes = []
+        self.tables = []
+
+        if origin is None:
+            origin_id = grid.wall_map.find(0)
+            if origin_id < 0:
+                self.seconds = time.perf_counter() - start_time
+                return
+        else:
+            origin_id = grid.node_id(origin)
+
+        # Unreachable cells score 0 so they are never picked; landmarks
+        # themselves score 0 as well.
+        scores = self._cost_table(origin_id)
+        self._clear_unreachable(scores)
+        while len(self.nodes) < count:
+            best = max(scores)
+            if not best:
+                break
+            landmark = scores.index(best)
+            table = self._cost_table(landmark)
+            self.nodes.append(landmark)
+            self.tables.append(table)
+            scores = array(self.typecode, map(min, scores, table))
+
+        self.seconds = time.perf_counter() - start_time
+
+    def _cost_table(self, source):
+        came_from, costs, _ = shortest_path_tree(self.grid, source, weighted=True)
+        table = array(self.typecode, costs)
+        unreachable = self.unreachable
+        for node, parent in enumerate(came_from):
+            if parent == UNREACHED:
+                table[node] = unreachable
+        return table
+
+    def _clear_unreachable(self, table):
+        unreachable = self.unreachable
+        for node, cost in enumerate(table):
+            if cost == unreachable:
+                table[node] = 0
+
+    @property
+    def nbytes(self):
+        """Memory held by the cost tables, in bytes."""
+        return sum(table.itemsize * len(table) for table in self.tables)
+
+    def is_current(self):
+        """True while the grid has not changed since preprocessing."""
+        return self.version == self.grid.version
+
+    def heuristic(self, goal):
+        """
+        Build the ALT heuristic towards ``goal``.
+
+        Args:
+            goal: Tuple (x, y) or node id of the goal
+
+        Returns:
+            heuristic: Callable mapping a node id to a lower bound on its
+                Grid.cost to the goal, suitable for astar_search
+
+        Raises:
+            ValueError: If walls or weights changed after preprocessing
+        """
+        if not self.is_current():
+            raise ValueError("Landmarks are stale: the grid changed after preprocessing")
+        grid = self.grid
+        goal_id = goal if isinstance(goal, int) else grid.node_id(goal)
+        weights = grid.weight_map
+        goal_weight = weights[goal_id]
+        unreachable = self.unreachable
+
+        # Landmarks outside the goal's connected area bound nothing.
+        entries = [(table, table[goal_id]) for table in self.tables if table[goal_id] != unreachable]
+
+        def heuristic(node):
+            best = 0
+            offset = goal_weight - weights[node]
+            for table, to_goal in entries:
+                # d(L, t) - d(L, v), then d(v, L) - d(t, L)
+                delta = to_goal - table[node]
+                if delta > best:
+                    best = delta
+                delta = offset - delta
+                if delta > best:
+                    best = delta
+            return best
+
+        return heuristic
+
+
+def alt_search(grid, start, goal, landmarks, visualizer=None, delay=100, weight=1.0):
+    """
+    A* with the landmark heuristic (ALT) on a preprocessed grid.
+
+    Args:
+        grid: Grid object containing the environment
+        start: Tuple (x, y) representing start position
+        goal: Tuple (x, y) representing goal position
+        landmarks: Landmarks computed for ``grid``
+        visualizer: GridVisualizer object for visualization (optional)
+        delay: Delay in milliseconds between visualization steps
+        weight: Heuristic inflation, as for astar_search
+
+    Returns:
+        path: List of tuples representing the path from start to goal
+        visited: Set of tuples representing all expanded nodes
+    """
+    return astar_search(grid, start, goal, visualizer, delay, weight, heuristic=landmarks.heuristic(goal))
@@ -1,7 +1,11 @@
+import argparse
 import pygame
-import random
-from grid import Grid
-from algorithms import bfs_search, dfs_search, ucs_search, dls_search, bidirectional_search
+from collections import Counter
+from grid import NodeSet
+from maps import build_config_grid
+from algorithms import EXPAND, POP, PUSH, VISIT, astar_steps, bfs_steps, bidirectional_steps, bidirectional_ucs_steps, dfs_steps, dls_steps, iddfs_steps, ucs_steps
+from incremental import DStarLite
+from search_trace import TraceCursor, TraceReader, TraceTimeline
 from ui.layout import UIManager
 from ui.button import Button
 from ui.slider import Slider
@@ -33,59 +37,28 @@ SLIDER_TRACK = (55, 65, 81)
 SLIDER_FILL = (59, 130, 246)
 SLIDER_KNOB = (255, 255, 255)
 
-
-def add_demo_walls(grid, start, goal):
-    """Create a deterministic obstacle pattern that adapts to grid size."""
-    walls = set()
-
-    # Central cross
-    cx = grid.width // 2
-    cy = grid.height // 2
-    for x in range(max(1, cx - max(2, grid.width // 6)), min(grid.width - 1, cx + max(2, grid.width // 6))):
-        walls.add((x, cy))
-    for y in range(max(1, cy - max(2, grid.height // 6)), min(grid.height - 1, cy + max(2, grid.height // 6))):
-        walls.add((cx, y))
-
-    # Upper-left pocket
-    ul_x = max(1, grid.width // 8)
-    ul_y = max(1, grid.height // 6)
-    for x in range(ul_x, min(grid.width - 2, ul_x + max(2, grid.width // 5))):
-        walls.add((x, ul_y))
-    for y in range(ul_y, min(grid.height - 2, ul_y + max(2, grid.height // 6))):
-        walls.add((ul_x, y))
-
-    # Bottom-right corridor
-    br_x = max(2, grid.width - max(3, grid.width // 5))
-    br_y = max(2, grid.height - max(3, grid.height // 5))
-    for y in range(br_y, grid.height - 1):
-        walls.add((br_x, y))
-    for x in range(max(1, br_x - max(2, grid.width // 8)), br_x + 1):
-        walls.add((x, grid.height - 2))
-
-    # Keep start and goal open
-    if start in walls:
-        walls.remove(start)
-    if goal in walls:
-        walls.remove(goal)
-
-    grid.walls = walls
-
-
-def run_iddfs(grid, start, goal, visualizer=None, delay=50):
-    """Run iterative deepening DFS and return path/visited/depth_found."""
-    path, visited = dls_search(grid, start, goal, 0, visualizer, delay=delay)
-    visited_total = set(visited)
-
-    if path:
-        return path, visited_total, 0
-
-    for depth_limit in range(1, grid.width + grid.height):
-        path, visited = dls_search(grid, start, goal, depth_limit, visualizer, delay=delay)
-        visited_total.update(visited)
-        if path:
-            return path, visited_total, depth_limit
-
-    return [], visited_total, None
+# Live searches render at a fixed frame rate; each frame may spend up to
+# STEP_BUDGET_MS advancing the search before it draws.
+ANIMATION_FPS = 60
+STEP_BUDGET_MS = 12
+
+# Milliseconds per expansion at 1x speed for each setup-screen algorithm.
+ANIMATION_DELAYS = {
+    "bfs": 80,
+    "dfs": 80,
+    "ucs": 80,
+    "dls": 80,
+    "iddfs": 45,
+    "bidirectional": 70,
+    "bidirectional_ucs": 70,
+    "astar": 80,
+    "dstar_lite": 80,
+}
+
+# Trace replay runs a whole trace in about this many seconds at 1x speed,
+# but never slower than REPLAY_MIN_RATE events per second.
+REPLAY_SECONDS = 30
+REPLAY_MIN_RATE = 60
 
 
 def build_info_lines(choice, grid, start, goal, status=None, path=None, visited=None, depth_limit=None, iddfs_depth_found=None, post_run=False):
@@ -121,15 +94,55 @@ def build_info_lines(choice, grid, start, goal, status=None, path=None, visited=
             "R = Reset / Rerun",
             "N = New Setup",
         ])
+        if choice == "dstar_lite":
+            lines.extend([
+                "Click = Toggle Wall",
+                "A = Walk Agent",
+            ])
     return lines
 
 
-class VisualizerInterrupt(Exception):
-    """Raised when user requests reset/new setup/exit during algorithm animation."""
-
-    def __init__(self, action):
-        super().__init__(action)
-        self.action = action
+class SearchFrame:
+    """
+    Visited/frontier state of an animated search, updated from deltas.
+
+    The frontier is kept as a multiset because lazy-deletion queues can hold
+    the same cell more than once. ``dirty`` collects every cell whose drawn
+    state changed since the last ``take_dirty`` call.
+    """
+
+    def __init__(self):
+        self.visited = set()
+        self.frontier = Counter()
+        self.current = None
+        self.dirty = set()
+
+    def apply(self, frontier_added=(), frontier_removed=(), visited_added=(), current=None):
+        frontier = self.frontier
+        # Additions first so a cell pushed and popped in one batch never goes negative.
+        for cell in frontier_added:
+            frontier[cell] += 1
+        for cell in frontier_removed:
+            count = frontier.pop(cell, 0) - 1
+            if count > 0:
+                frontier[cell] = count
+        self.visited.update(visited_added)
+
+        dirty = self.dirty
+        dirty.update(frontier_added)
+        dirty.update(frontier_removed)
+        dirty.update(visited_added)
+        if current != self.current:
+            if self.current is not None:
+                dirty.add(self.current)
+            if current is not None:
+                dirty.add(current)
+            self.current = current
+
+    def take_dirty(self):
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
 
 
 class GridVisualizer:
@@ -164,6 +177,19 @@ class GridVisualizer:
             "current": None,
             "frontier": None,
         }
+        self.frame = SearchFrame()
+        self._background = None
+        self._background_key = None
+        self._needs_full_redraw = True
+        self._path_cells = set()
+        self._frontier_cells = None
+        self.grid_offset = (0, 0)
+        # Incremental planner for live wall editing after the run (D* Lite).
+        self.planner = None
+        self.walking = False
+        self.walk_interval = 150
+        # Trace replay (see replay()); the scrub slider is only shown then.
+        self.replaying = False
 
         pygame.init()
         self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
@@ -199,6 +225,7 @@ class GridVisualizer:
         self.buttons["reset"] = Button((0, 0, 120, 40), "Reset", self.small_font, BUTTON_BG, WHITE, hover_color=BUTTON_HOVER, radius=10)
         self.buttons["setup"] = Button((0, 0, 140, 40), "New Setup", self.small_font, BUTTON_BG, WHITE, hover_color=BUTTON_HOVER, radius=10)
         self.speed_slider = Slider((0, 0, 220, 20), self.speed_min, self.speed_max, self.speed_multiplier, SLIDER_TRACK, SLIDER_FILL, SLIDER_KNOB)
+        self.scrub_slider = Slider((0, 0, 220, 20), 0, 1, 0, SLIDER_TRACK, SLIDER_FILL, SLIDER_KNOB)
 
     def set_info_lines(self, lines):
         self.info_lines = lines or []
@@ -239,6 +266,9 @@ class GridVisualizer:
         slider_y = self.control_area.y + (control_h // 2) + 8
         self.speed_slider.update_rect((slider_x, slider_y, slider_w, 18))
 
+        scrub_x = self.buttons["setup"].rect.right + 18
+        self.scrub_slider.update_rect((scrub_x, slider_y, max(60, slider_x - scrub_x - 36), 18))
+
     def _handle_visual_event(self, event):
         """Handle common visualizer interactions for both animation and post-run phases."""
         if event.type == pygame.QUIT:
@@ -266,6 +296,7 @@ class GridVisualizer:
             self.width = max(event.w, self.min_window_width)
             self.height = max(event.h, self.min_window_height)
             self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
+            self._needs_full_redraw = True
 
         if self.speed_slider.handle_event(event):
             self.speed_multiplier = self.speed_slider.value
@@ -310,6 +341,7 @@ class GridVisualizer:
         if frontier is None and self.last_frame["frontier"] is not None:
             frontier = self.last_frame["frontier"]
 
+        previous = self.last_frame
         self.last_frame = {
             "path": path,
             "start": start,
@@ -320,10 +352,73 @@ class GridVisualizer:
         }
 
         self._update_layout()
-        self.screen.fill(APP_BG)
+        background_rebuilt = self._ensure_background()
+
+        # Repaint everything when the layout, walls or displayed collections
+        # changed; otherwise only the cells touched since the last frame.
+        full_redraw = (
+            background_rebuilt
+            or self._needs_full_redraw
+            or path is not previous["path"]
+            or visited is not previous["visited"]
+            or frontier is not previous["frontier"]
+            or start != previous["start"]
+            or goal != previous["goal"]
+        )
+
+        dirty = self.frame.take_dirty()
+        self._needs_full_redraw = False
+        if full_redraw:
+            self._path_cells = set(path) if path else set()
+            self._frontier_cells = set(frontier) if isinstance(frontier, list) else frontier
+            self.screen.blit(self._background, (0, 0))
+            for cells in (visited, frontier, path, (current, start, goal)):
+                for cell in cells or ():
+                    if cell is not None:
+                        self._paint_cell(cell)
+            self.legend.draw(self.screen, self.legend_area)
+        else:
+            if current != previous["current"]:
+                dirty.update(cell for cell in (current, previous["current"]) if cell is not None)
+            dirty_rects = [self._paint_cell(cell) for cell in dirty]
 
         self.toolbar.draw(self.screen, self.width, "AI PathFinder", self.algorithm_label, self.speed_multiplier)
 
+        # Control panel.
+        pygame.draw.rect(self.screen, TOP_BAR_BG, self.control_area)
+        for button in self.buttons.values():
+            button.draw(self.screen)
+
+        speed_text = self.small_font.render(f"Speed: {self.speed_multiplier:.2f}x", True, TEXT_PRIMARY)
+        self.screen.blit(speed_text, (self.speed_slider.rect.x, self.control_area.y + 6))
+        self.speed_slider.draw(self.screen)
+
+        if self.replaying:
+            # Step counter above the scrub slider.
+            status = f"Paused - {self.status_label}" if self.paused else self.status_label
+            status_text = self.small_font.render(status, True, TEXT_SECONDARY)
+            self.screen.blit(status_text, (self.scrub_slider.rect.x, self.control_area.y + 6))
+            self.scrub_slider.draw(self.screen)
+        else:
+            status = "Paused" if self.paused else self.status_label
+            status_text = self.small_font.render(status, True, TEXT_SECONDARY)
+            self.screen.blit(status_text, (self.buttons["setup"].rect.right + 18, self.control_area.y + (self.control_area.height - status_text.get_height()) // 2))
+
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            dirty_rects.append(pygame.Rect(0, 0, self.width, self.top_bar_height))
+            dirty_rects.append(self.control_area)
+            pygame.display.update(dirty_rects)
+
+    def _ensure_background(self):
+        """
+        (Re)build the static grid layer when the window, cell size or walls change.
+
+        The layer holds the app background, base cells, walls and grid lines so
+        frames only paint the cells whose search state changed on top of it.
+        Returns True when the layer was rebuilt.
+        """
         # Center grid within available grid area.
         self.cell_size = max(
             8,
@@ -337,92 +432,181 @@ class GridVisualizer:
         offset_x = self.grid_area.x + (self.grid_area.width - grid_w) // 2
         offset_y = self.grid_area.y + (self.grid_area.height - grid_h) // 2
 
-        def cell_rect(x, y):
-            return pygame.Rect(offset_x + x * self.cell_size, offset_y + y * self.cell_size, self.cell_size, self.cell_size)
+        key = (self.width, self.height, self.cell_size, offset_x, offset_y, self.grid.walls_version)
+        if key == self._background_key:
+            return False
+        self._background_key = key
+        self.grid_offset = (offset_x, offset_y)
 
-        # Draw base cells first.
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                rect = cell_rect(x, y)
-                inner = rect.inflate(-self.cell_padding * 2, -self.cell_padding * 2)
-                pygame.draw.rect(self.screen, GRID_CELL_BG, inner, border_radius=4)
+        background = pygame.Surface((self.width, self.height))
+        background.fill(APP_BG)
 
-        def draw_cells(cells, color):
-            if not cells:
-                return
-            for x, y in cells:
-                rect = cell_rect(x, y)
-                inner = rect.inflate(-self.cell_padding * 2, -self.cell_padding * 2)
-                pygame.draw.rect(self.screen, color, inner, border_radius=4)
-
-        draw_cells(visited, LIGHT_BLUE)
-        draw_cells(frontier, PURPLE)
-        draw_cells(path, YELLOW)
-        draw_cells(self.grid.walls, TOP_BAR_BG)
-
-        if current:
-            draw_cells([current], ORANGE)
-        if start:
-            draw_cells([start], GREEN)
-        if goal:
-            draw_cells([goal], RED)
+        # Base cells, with walls painted straight into the static layer.
+        wall_map = self.grid.wall_map
+        for y in range(self.grid.height):
+            row = y * self.grid.width
+            for x in range(self.grid.width):
+                color = TOP_BAR_BG if wall_map[row + x] else GRID_CELL_BG
+                inner = self._cell_rect((x, y)).inflate(-self.cell_padding * 2, -self.cell_padding * 2)
+                pygame.draw.rect(background, color, inner, border_radius=4)
 
         # Subtle grid lines.
         for x in range(self.grid.width + 1):
             px = offset_x + x * self.cell_size
-            pygame.draw.line(self.screen, GRID_LINE, (px, offset_y), (px, offset_y + grid_h), 1)
+            pygame.draw.line(background, GRID_LINE, (px, offset_y), (px, offset_y + grid_h), 1)
         for y in range(self.grid.height + 1):
             py = offset_y + y * self.cell_size
-            pygame.draw.line(self.screen, GRID_LINE, (offset_x, py), (offset_x + grid_w, py), 1)
+            pygame.draw.line(background, GRID_LINE, (offset_x, py), (offset_x + grid_w, py), 1)
+
+        self._background = background
+        return True
+
+    def _cell_at(self, pos):
+        """Return the (x, y) cell under a screen position, or None."""
+        offset_x, offset_y = self.grid_offset
+        x = (pos[0] - offset_x) // self.cell_size
+        y = (pos[1] - offset_y) // self.cell_size
+        if 0 <= x < self.grid.width and 0 <= y < self.grid.height:
+            return (x, y)
+        return None
+
+    def _cell_rect(self, cell):
+        offset_x, offset_y = self.grid_offset
+        return pygame.Rect(offset_x + cell[0] * self.cell_size, offset_y + cell[1] * self.cell_size, self.cell_size, self.cell_size)
+
+    def _cell_color(self, cell):
+        """Return the overlay color for a cell, or None when only the static layer shows."""
+        frame = self.last_frame
+        if cell == frame["goal"]:
+            return RED
+        if cell == frame["start"]:
+            return GREEN
+        if cell == frame["current"]:
+            return ORANGE
+        if self.grid.wall_map[self.grid.node_id(cell)]:
+            return None
+        if cell in self._path_cells:
+            return YELLOW
+        # "is not None" rather than truthiness: len() of a NodeSet scans the grid.
+        if self._frontier_cells is not None and cell in self._frontier_cells:
+            return PURPLE
+        if frame["visited"] is not None and cell in frame["visited"]:
+            return LIGHT_BLUE
+        return None
+
+    def _paint_cell(self, cell):
+        """Restore a cell from the static layer, draw its overlay and return its rect."""
+        rect = self._cell_rect(cell)
+        self.screen.blit(self._background, rect, rect)
+        color = self._cell_color(cell)
+        if color is not None:
+            inner = rect.inflate(-self.cell_padding * 2, -self.cell_padding * 2)
+            pygame.draw.rect(self.screen, color, inner, border_radius=4)
+        return rect
+
+    def begin_search(self, start, goal):
+        """Reset the animation state before a search starts streaming deltas."""
+        self.frame = SearchFrame()
+        self._needs_full_redraw = True
+        self.last_frame = {
+            "path": None,
+            "start": start,
+            "goal": goal,
+            "visited": self.frame.visited,
+            "current": None,
+            "frontier": self.frame.frontier,
+        }
 
-        # Control panel.
-        pygame.draw.rect(self.screen, TOP_BAR_BG, self.control_area)
-        for button in self.buttons.values():
-            button.draw(self.screen)
+    def apply_delta(self, frontier_added=(), frontier_removed=(), visited_added=(), current=None):
+        """
+        Update the animation state with the changes since the previous frame.
 
-        speed_text = self.small_font.render(f"Speed: {self.speed_multiplier:.2f}x", True, TEXT_PRIMARY)
-        self.screen.blit(speed_text, (self.speed_slider.rect.x, self.control_area.y + 6))
-        self.speed_slider.draw(self.screen)
+        Args:
+            frontier_added: Tuples (x, y) pushed onto the frontier
+            frontier_removed: Tuples (x, y) popped from the frontier
+            visited_added: Tuples (x, y) newly marked visited
+            current: Tuple (x, y) representing currently exploring node
+        """
+        self.frame.apply(frontier_added, frontier_removed, visited_added, current)
+        self.last_frame["current"] = self.frame.current
 
-        status = "Paused" if self.paused else self.status_label
-        status_text = self.small_font.render(status, True, TEXT_SECONDARY)
-        self.screen.blit(status_text, (self.buttons["setup"].rect.right + 18, self.control_area.y + (self.control_area.height - status_text.get_height()) // 2))
+    def play(self, steps, start, goal, delay, fps=ANIMATION_FPS):
+        """
+        Animate a search step engine at a fixed frame rate.
 
-        # Legend.
-        self.legend.draw(self.screen, self.legend_area)
-        
-        pygame.display.flip()
-    
-    def delay(self, milliseconds):
-        """Delay for visualization"""
-        adjusted_delay = int(milliseconds / max(self.speed_multiplier, 0.01))
-        elapsed = 0
-        step = 10
-
-        # Keep visualizer responsive during algorithm animation.
-        while elapsed < adjusted_delay:
-            for event in pygame.event.get():
-                action = self._handle_visual_event(event)
-                if action in ("exit", "rerun", "reconfigure"):
-                    raise VisualizerInterrupt(action)
+        The engine is stepped from the render loop: each frame pulls the
+        expansions that fell due since the previous one (one per ``delay``
+        ms at 1x speed, or as many as fit with ``delay`` 0), stopping early
+        once STEP_BUDGET_MS is spent, and then draws once. Events are
+        batched into deltas, so a frame costs what changed rather than the
+        search size. Pausing stops pulling events and a single step pulls one
+        expansion; reset, new setup and exit close the engine and return.
 
-            while self.paused and not self.step_once:
-                self.draw_grid()
-                for event in pygame.event.get():
-                    action = self._handle_visual_event(event)
-                    if action in ("exit", "rerun", "reconfigure"):
-                        raise VisualizerInterrupt(action)
-                self.clock.tick(60)
+        Args:
+            steps: Generator yielding (kind, node_id) events (see algorithms.py)
+            start: Tuple (x, y) representing start position
+            goal: Tuple (x, y) representing goal position
+            delay: Milliseconds per expansion at 1x speed
+            fps: Frames per second
+
+        Returns:
+            The result returned by the step engine, or None when the user
+            stopped the run; the requested action is then left in
+            pending_action
+        """
+        node_pos = self.grid.node_pos
+        self.begin_search(start, goal)
+        added = []
+        removed = []
+        newly_visited = []
+        current = None
+        due = 0.0
+        self.clock.tick()
+
+        while True:
+            for event in pygame.event.get():
+                if self._handle_visual_event(event) in ("exit", "rerun", "reconfigure"):
+                    steps.close()
+                    return None
 
-            if self.step_once:
+            elapsed = self.clock.tick(fps)
+            if self.paused:
+                due = 1.0 if self.step_once else 0.0
                 self.step_once = False
-                self.paused = True
-                break
+            elif delay > 0:
+                due += elapsed * self.speed_multiplier / delay
+            else:
+                due = float("inf")
+
+            deadline = pygame.time.get_ticks() + STEP_BUDGET_MS
+            while due >= 1:
+                try:
+                    kind, node = next(steps)
+                except StopIteration as stop:
+                    self.apply_delta(added, removed, newly_visited, current)
+                    self.draw_grid()
+                    return stop.value
+
+                if kind == PUSH:
+                    added.append(node_pos(node))
+                elif kind == POP:
+                    removed.append(node_pos(node))
+                elif kind == VISIT:
+                    newly_visited.append(node_pos(node))
+                elif kind == EXPAND:
+                    current = node_pos(node)
+                    due -= 1
+                    if pygame.time.get_ticks() >= deadline:
+                        # Out of frame time: drop the backlog rather than
+                        # letting it grow while the search cannot keep up.
+                        due = 0.0
+
+            self.apply_delta(added, removed, newly_visited, current)
+            added = []
+            removed = []
+            newly_visited = []
+            self.draw_grid()
 
-            chunk = min(step, adjusted_delay - elapsed)
-            pygame.time.delay(chunk)
-            elapsed += chunk
-    
     def run(self, path=None, start=None, goal=None, visited=None, fps=60):
         """
         Main loop to display the grid
@@ -433,8 +617,12 @@ class GridVisualizer:
             goal: Tuple (x, y) representing goal position
             visited: Set of tuples representing visited nodes
             fps: Frames per second
+
+        With a planner attached, clicking a cell toggles its wall and the
+        planner's repair is animated; A walks the start along the path.
         """
         running = True
+        walk_elapsed = 0
         while running:
             for event in pygame.event.get():
                 action = self._handle_visual_event(event)
@@ -447,11 +635,164 @@ class GridVisualizer:
                     self.pending_action = None
                     return "reconfigure"
 
+                if self.planner is None:
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_a:
+                    self.walking = not self.walking
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    cell = self._cell_at(event.pos)
+                    if cell is None or cell in (start, goal):
+                        continue
+                    if cell in self.grid.walls:
+                        self.grid.walls.discard(cell)
+                    else:
+                        self.grid.walls.add(cell)
+                    result = self.replan(start, goal)
+                    if result is None:
+                        action = self.pending_action
+                        self.pending_action = None
+                        return action
+                    path, visited = result
+
+            if self.walking:
+                walk_elapsed += self.clock.get_time()
+                if walk_elapsed >= self.walk_interval:
+                    walk_elapsed = 0
+                    if path and len(path) > 1:
+                        # The planner keeps its tree; only the start moves.
+                        start = path[1]
+                        path = path[1:]
+                        self.planner.move_start(start)
+                    else:
+                        self.walking = False
+
             self.draw_grid(path, start, goal, visited)
             self.clock.tick(fps)
 
         return "exit"
 
+    def replan(self, start, goal, delay=15):
+        """
+        Animate the attached planner repairing its path after an edit.
+
+        Returns:
+            The (path, visited) result of the repair, visited only holding
+            the nodes the repair expanded, or None if the user stopped it
+        """
+        result = self.play(self.planner.replan_steps(), start, goal, delay)
+        if result is not None:
+            self.status_label = f"Replanned: {self.planner.expanded} expanded"
+        return result
+
+    def replay(self, timeline, fps=60):
+        """
+        Play back a recorded trace with scrubbing and reverse playback.
+
+        The trace position moves in events, at a rate that plays the whole
+        trace in about REPLAY_SECONDS at 1x; the speed slider scales it. Each
+        frame seeks a TraceCursor and repaints only the cells whose state
+        changed, so dragging the scrub slider across millions of events stays
+        interactive.
+
+        Space pauses, B reverses direction, Left/Right step one expansion,
+        Home/End jump to either end and R restarts.
+
+        Args:
+            timeline: search_trace.TraceTimeline of a trace recorded on this grid
+            fps: Frames per second
+
+        Returns:
+            "exit" or "reconfigure"
+        """
+        grid = self.grid
+        node_pos = grid.node_pos
+        count = timeline.count
+        cursor = TraceCursor(timeline)
+        start = timeline.start
+        goal = timeline.goal
+        # Flag views over the cursor's buffers keep their identity across
+        # seeks, so draw_grid only repaints the cells marked dirty.
+        visited = NodeSet(grid, cursor.visited)
+        frontier = NodeSet(grid, cursor.frontier)
+        # The path appears once the end is reached; the list is filled and
+        # emptied in place for the same reason.
+        shown_path = []
+
+        self.begin_search(start, goal)
+        self.replaying = True
+        self.paused = False
+        self.scrub_slider.max_value = float(max(count, 1))
+        rate = max(REPLAY_MIN_RATE, count / REPLAY_SECONDS)
+        position = 0.0
+        direction = 1
+
+        try:
+            while True:
+                target = None
+                for event in pygame.event.get():
+                    action = self._handle_visual_event(event)
+                    if action in ("exit", "reconfigure"):
+                        self.pending_action = None
+                        return action
+                    if action == "rerun":
+                        self.pending_action = None
+                        target = 0
+                    if self.scrub_slider.handle_event(event):
+                        target = round(self.scrub_slider.value)
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_b:
+                            direction = -direction
+                            self.paused = False
+                        elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                            offset = 1 if event.key == pygame.K_RIGHT else -1
+                            target = timeline.expansion_step(cursor.step, offset)
+                            self.paused = True
+                        elif event.key == pygame.K_HOME:
+                            target = 0
+                        elif event.key == pygame.K_END:
+                            target = count
+                self.step_once = False
+
+                elapsed = self.clock.tick(fps)
+                if target is not None:
+                    position = float(target)
+                elif not self.paused and not self.scrub_slider.dragging:
+                    # Resuming at the end a run stopped on plays it again.
+                    if direction > 0 and position >= count:
+                        position = 0.0
+                    elif direction < 0 and position <= 0:
+                        position = float(count)
+                    position += direction * rate * self.speed_multiplier * elapsed / 1000
+                    if not 0 < position < count:
+                        position = float(max(0, min(position, count)))
+                        self.paused = True
+
+                dirty = self.frame.dirty
+                changed = cursor.seek(int(position))
+                if len(changed) * 4 > grid.size:
+                    self._needs_full_redraw = True
+                else:
+                    dirty.update(map(node_pos, changed.tolist()))
+
+                current = None if cursor.current is None else node_pos(cursor.current)
+                previous = self.last_frame["current"]
+                if current != previous:
+                    # draw_grid keeps the previous current for None, so clear it here.
+                    dirty.update(cell for cell in (current, previous) if cell is not None)
+                    self.last_frame["current"] = current
+
+                if (cursor.step == count) != bool(shown_path):
+                    shown_path[:] = timeline.path if cursor.step == count else []
+                    dirty.update(self._path_cells)
+                    self._path_cells = set(shown_path)
+                    dirty.update(shown_path)
+
+                self.scrub_slider.value = float(cursor.step)
+                self.status_label = f"Step {cursor.step:,} / {count:,}" + (" (reverse)" if direction < 0 else "")
+                self.draw_grid(shown_path, start, goal, visited, None, frontier)
+        finally:
+            self.replaying = False
+
 
 def get_user_config_via_pygame(initial_width=980, initial_height=600, initial_config=None):
     """Collect configuration from user via the modular Pygame dashboard UI."""
@@ -459,24 +800,43 @@ def get_user_config_via_pygame(initial_width=980, initial_height=600, initial_co
     return ui.run(initial_config=initial_config)
 
 
+def session_steps(choice, grid, start, goal, depth_limit=None, planner=None):
+    """
+    Return the step engine for a setup-screen algorithm.
+
+    D* Lite repairs through ``planner`` so the session can keep editing
+    walls afterwards. Returns None for an unknown choice.
+    """
+    if choice == "bfs":
+        return bfs_steps(grid, start, goal)
+    if choice == "dfs":
+        return dfs_steps(grid, start, goal)
+    if choice == "ucs":
+        return ucs_steps(grid, start, goal)
+    if choice == "dls":
+        return dls_steps(grid, start, goal, depth_limit)
+    if choice == "iddfs":
+        return iddfs_steps(grid, start, goal)
+    if choice == "bidirectional":
+        return bidirectional_steps(grid, start, goal)
+    if choice == "bidirectional_ucs":
+        return bidirectional_ucs_steps(grid, start, goal)
+    if choice == "astar":
+        return astar_steps(grid, start, goal)
+    if choice == "dstar_lite":
+        return planner.replan_steps()
+    return None
+
+
 def run_search_with_config(config):
     """Run one search session using a config and return visualizer + result context."""
-    grid = Grid(config["grid_width"], config["grid_height"])
+    grid = build_config_grid(config)
     start = config["start"]
     goal = config["goal"]
-    add_demo_walls(grid, start, goal)
 
     choice = config["algorithm"]
     depth_limit = config["depth_limit"]
 
-    if choice == "ucs":
-        for x in range(grid.width):
-            for y in range(grid.height):
-                if (x, y) not in grid.walls:
-                    grid.weights[(x, y)] = random.randint(1, 10)
-    else:
-        grid.weights = {}
-
     visualizer = GridVisualizer(grid, cell_size=42, window_width=1120, window_height=720)
     visualizer.set_info_lines(
         build_info_lines(
@@ -491,26 +851,20 @@ def run_search_with_config(config):
         )
     )
 
+    if choice == "dstar_lite":
+        visualizer.planner = DStarLite(grid, start, goal)
+    steps = session_steps(choice, grid, start, goal, depth_limit, visualizer.planner)
+    result = visualizer.play(steps, start, goal, ANIMATION_DELAYS[choice]) if steps is not None else ([], set())
+
     iddfs_depth_found = None
     interrupt_action = None
-    try:
-        if choice == "bfs":
-            path, visited = bfs_search(grid, start, goal, visualizer, delay=80)
-        elif choice == "dfs":
-            path, visited = dfs_search(grid, start, goal, visualizer, delay=80)
-        elif choice == "ucs":
-            path, visited = ucs_search(grid, start, goal, visualizer, delay=80)
-        elif choice == "dls":
-            path, visited = dls_search(grid, start, goal, depth_limit, visualizer, delay=80)
-        elif choice == "iddfs":
-            path, visited, iddfs_depth_found = run_iddfs(grid, start, goal, visualizer, delay=45)
-        elif choice == "bidirectional":
-            path, visited = bidirectional_search(grid, start, goal, visualizer, delay=70)
-        else:
-            path, visited = [], set()
-    except VisualizerInterrupt as interrupt:
-        interrupt_action = interrupt.action
+    if result is None:
+        interrupt_action = visualizer.pending_action
         path, visited = [], set()
+    elif choice == "iddfs":
+        path, visited, iddfs_depth_found, _ = result
+    else:
+        path, visited = result
 
     status = "Path Found" if path else "No Path Found"
     visualizer.set_info_lines(
@@ -537,7 +891,24 @@ def run_search_with_config(config):
     return visualizer, path, visited, start, goal, interrupt_action
 
 
-def main():
+def replay_trace(path):
+    """Replay a recorded search trace; returns "exit" or "reconfigure"."""
+    reader = TraceReader(path)
+    timeline = TraceTimeline(reader)
+    visualizer = GridVisualizer(reader.make_grid(), cell_size=42, window_width=1120, window_height=720)
+    visualizer.set_info_lines(build_info_lines(reader.label or "trace", visualizer.grid, reader.start, reader.goal, status="Replaying"))
+    return visualizer.replay(timeline)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Visualize grid search algorithms.")
+    parser.add_argument("--replay", metavar="TRACE", help="Replay a trace recorded with search_trace.py instead of running a search")
+    args = parser.parse_args(argv)
+
+    if args.replay and replay_trace(args.replay) == "exit":
+        pygame.quit()
+        return
+
     config = get_user_config_via_pygame()
     if config is None:
         pygame.quit()
@@ -0,0 +1,355 @@
+"""Grid builders: the demo session layout, MovingAI .map/.scen and Netpbm bitmap loaders."""
+
+from contextlib import nullcontext
+import mmap
+import os
+import random
+import struct
+
+import numpy as np
+
+from algorithms import WEIGHTED_ALGORITHMS
+from grid import DEFAULT_COST, Grid
+
+# Terrain characters that are passable for a ground unit; everything else is a wall.
+PASSABLE = b".GS"
+
+# Translation table turning a map row into wall_map bytes (0 = open, 1 = wall).
+_WALL_TABLE = bytes(0 if value in PASSABLE else 1 for value in range(256))
+
+# Magic numbers of the binary Netpbm formats load_bitmap reads.
+NETPBM_MAGIC = (b"P4", b"P5")
+
+# PGM translation tables: 0 is a wall (keeping the default weight), anything
+# else is an open cell of that weight.
+_PGM_WALLS = bytes([1]) + bytes(255)
+_PGM_WEIGHTS = bytes([DEFAULT_COST]) + bytes(range(1, 256))
+
+# Raster bytes converted per block when loading bitmaps and snapshots.
+BLOCK_BYTES = 1 << 20
+
+# Grid snapshot layout (see save_snapshot): magic, format version, width,
+# height and point count, followed by the points as (x, y) pairs.
+SNAPSHOT_MAGIC = b"GRIDSNAP"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<8sIIII")
+_SNAPSHOT_POINT = struct.Struct("<II")
+
+
+def add_demo_walls(grid, start, goal):
+    """Create a deterministic obstacle pattern that adapts to grid size."""
+    walls = set()
+
+    # Central cross
+    cx = grid.width // 2
+    cy = grid.height // 2
+    for x in range(max(1, cx - max(2, grid.width // 6)), min(grid.width - 1, cx + max(2, grid.width // 6))):
+        walls.add((x, cy))
+    for y in range(max(1, cy - max(2, grid.height // 6)), min(grid.height - 1, cy + max(2, grid.height // 6))):
+        walls.add((cx, y))
+
+    # Upper-left pocket
+    ul_x = max(1, grid.width // 8)
+    ul_y = max(1, grid.height // 6)
+    for x in range(ul_x, min(grid.width - 2, ul_x + max(2, grid.width // 5))):
+        walls.add((x, ul_y))
+    for y in range(ul_y, min(grid.height - 2, ul_y + max(2, grid.height // 6))):
+        walls.add((ul_x, y))
+
+    # Bottom-right corridor
+    br_x = max(2, grid.width - max(3, grid.width // 5))
+    br_y = max(2, grid.height - max(3, grid.height // 5))
+    for y in range(br_y, grid.height - 1):
+        walls.add((br_x, y))
+    for x in range(max(1, br_x - max(2, grid.width // 8)), br_x + 1):
+        walls.add((x, grid.height - 2))
+
+    # Keep start and goal open
+    if start in walls:
+        walls.remove(start)
+    if goal in walls:
+        walls.remove(goal)
+
+    grid.walls = walls
+
+
+def build_config_grid(config, rng=None):
+    """
+    Build the grid a setup-screen configuration runs on.
+
+    The grid gets the demo walls and, for the weighted algorithms, random
+    weights of 1-10 on every open cell, exactly as the visualizer session uses.
+
+    Args:
+        config: Dictionary as returned by UIManager._validate
+        rng: Optional random.Random for the weights (default: the random module)
+
+    Returns:
+        Grid object
+    """
+    grid = Grid(config["grid_width"], config["grid_height"])
+    add_demo_walls(grid, config["start"], config["goal"])
+
+    if config["algorithm"] in WEIGHTED_ALGORITHMS:
+        randint = (rng or random).randint
+        weight_map = grid.weight_map
+        wall_map = grid.wall_map
+        # Same x-major draw order as the original per-cell loop.
+        for x in range(grid.width):
+            for node in range(x, grid.size, grid.width):
+                if not wall_map[node]:
+                    weight_map[node] = randint(1, 10)
+        grid.touch_weights()
+    return grid
+
+
+def _mapped(handle):
+    """Map an open file read-only; empty files (which mmap rejects) map to b""."""
+    if os.fstat(handle.fileno()).st_size == 0:
+        return nullcontext(b"")
+    return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _next_line(data, pos):
+    """Return (line, next_pos) for the line starting at ``pos``, or (None, pos) at EOF."""
+    if pos >= len(data):
+        return None, pos
+    end = data.find(b"\n", pos)
+    if end < 0:
+        end = len(data)
+    return data[pos:end], end + 1
+
+
+def load_map(path, use_adjacency=False):
+    """Load a map file, picking the loader from its first bytes (see load_bitmap and load_snapshot)."""
+    with open(path, "rb") as handle:
+        magic = handle.read(len(SNAPSHOT_MAGIC))
+    if magic == SNAPSHOT_MAGIC:
+        return load_snapshot(path, use_adjacency)[0]
+    if magic[:2] in NETPBM_MAGIC:
+        return load_bitmap(path, use_adjacency)
+    return load_movingai_map(path, use_adjacency)
+
+
+def load_movingai_map(path, use_adjacency=False):
+    """
+    Load a MovingAI ``.map`` file into a Grid.
+
+    The header must give ``height`` and ``width`` and end with a ``map`` line;
+    ``.``, ``G`` and ``S`` cells are passable, all other terrain (trees,
+    water, out-of-bounds) becomes a wall.
+
+    The file is memory-mapped and converted one row at a time with a byte
+    translation table, so large maps are never read whole and no Python
+    object is created per cell.
+    """
+    with open(path, "rb") as handle, _mapped(handle) as data:
+        header = {}
+        pos = 0
+        while True:
+            line, pos = _next_line(data, pos)
+            if line is None:
+                raise ValueError(f"{path}: missing 'map' line")
+            line = line.strip()
+            if line == b"map":
+                break
+            if line:
+                key, _, value = line.partition(b" ")
+                header[key.decode("ascii").lower()] = value.decode("ascii").strip()
+
+        try:
+            width = int(header["width"])
+            height = int(header["height"])
+        except (KeyError, ValueError):
+            raise ValueError(f"{path}: header must define integer width and height") from None
+
+        grid = Grid(width, height, use_adjacency=use_adjacency)
+        for y in range(height):
+            row, pos = _next_line(data, pos)
+            row = (row or b"").rstrip(b"\r")
+            if len(row) != width:
+                raise ValueError(f"{path}: row {y} has {len(row)} cells, expected {width}")
+            grid.wall_map[y * width:(y + 1) * width] = row.translate(_WALL_TABLE)
+
+    grid.touch_walls()
+    return grid
+
+
+def _netpbm_header(data, path, count):
+    """
+    Parse the ``count`` decimal fields after a Netpbm magic number.
+
+    Returns:
+        fields: List of the parsed integers
+        offset: Position of the first raster byte
+    """
+    pos = 2
+    fields = []
+    while len(fields) < count:
+        # Fields are separated by whitespace and "#" comments running to the end of the line
+        while pos < len(data) and (data[pos] in b" \t\r\n" or data[pos] == ord("#")):
+            if data[pos] == ord("#"):
+                end = data.find(b"\n", pos)
+                pos = len(data) if end < 0 else end
+            pos += 1
+        start = pos
+        while pos < len(data) and 48 <= data[pos] <= 57:
+            pos += 1
+        if start == pos:
+            raise ValueError(f"{path}: truncated or malformed Netpbm header")
+        fields.append(int(data[start:pos]))
+    # Exactly one whitespace byte separates the header from the raster
+    return fields, pos + 1
+
+
+def load_bitmap(path, use_adjacency=False):
+    """
+    Load a binary Netpbm bitmap into a Grid.
+
+    Two raw formats are accepted, both exportable from common image editors:
+
+    - PBM (``P4``): one bit per cell, packed eight to a byte with every row
+      padded to a whole byte; set bits (black) are walls.
+    - PGM (``P5``) with maxval up to 255: one byte per cell; 0 is a wall and
+      any other value is the cell's weight.
+
+    The raster is memory-mapped and converted in blocks of rows, so files
+    larger than memory stream through and no Python object is created per
+    cell.
+    """
+    with open(path, "rb") as handle, _mapped(handle) as data:
+        magic = data[:2]
+        if magic not in NETPBM_MAGIC:
+            raise ValueError(f"{path}: not a binary PBM (P4) or PGM (P5) file")
+        pgm = magic == b"P5"
+        fields, offset = _netpbm_header(data, path, 3 if pgm else 2)
+        width, height = fields[0], fields[1]
+        if pgm and not 0 < fields[2] <= 255:
+            raise ValueError(f"{path}: PGM maxval must be 1-255, got {fields[2]}")
+
+        row_bytes = width if pgm else (width + 7) // 8
+        if len(data) - offset < row_bytes * height:
+            raise ValueError(f"{path}: raster holds {len(data) - offset} bytes, expected {row_bytes * height}")
+
+        grid = Grid(width, height, use_adjacency=use_adjacency)
+        rows = max(1, BLOCK_BYTES // max(1, row_bytes))
+        for y in range(0, height, rows):
+            stop = min(height, y + rows)
+            block = data[offset + y * row_bytes:offset + stop * row_bytes]
+            cells = slice(y * width, stop * width)
+            if pgm:
+                grid.wall_map[cells] = block.translate(_PGM_WALLS)
+                grid.weight_map[cells] = block.translate(_PGM_WEIGHTS)
+            else:
+                bits = np.frombuffer(block, dtype=np.uint8).reshape(stop - y, row_bytes)
+                grid.wall_map[cells] = np.unpackbits(bits, axis=1, count=width).tobytes()
+
+    grid.touch_walls()
+    if pgm:
+        grid.touch_weights()
+    return grid
+
+
+def save_snapshot(grid, path, points=()):
+    """
+    Write ``grid`` to a binary snapshot file.
+
+    After the header and points come the walls as a bitmap (one bit per
+    cell in node id order, most significant bit first, padded to a whole
+    byte) and then the weight plane, one byte per cell exactly as
+    ``weight_map`` holds it.
+
+    Args:
+        grid: Grid object to save
+        path: Output file path
+        points: Optional (x, y) cells to keep with the grid, e.g. [start, goal]
+    """
+    points = [tuple(point) for point in points]
+    with open(path, "wb") as handle:
+        handle.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, grid.width, grid.height, len(points)))
+        for x, y in points:
+            handle.write(_SNAPSHOT_POINT.pack(x, y))
+        handle.write(np.packbits(np.frombuffer(grid.wall_map, dtype=np.uint8)).tobytes())
+        handle.write(grid.weight_map)
+
+
+def load_snapshot(path, use_adjacency=False):
+    """
+    Load a grid written by save_snapshot.
+
+    The file is memory-mapped; the weight plane is copied straight into
+    ``weight_map`` and the wall bitmap unpacked into ``wall_map`` in blocks,
+    so loading costs about one pass over the data and regenerates nothing.
+    This is one full copy, not a zero-copy view: the grid owns its
+    bytearrays and shares no memory with the file or the map, so it can be
+    edited freely after the file is closed or rewritten.
+
+    Returns:
+        grid: Grid object
+        points: List of the (x, y) cells saved with it
+    """
+    with open(path, "rb") as handle, _mapped(handle) as data:
+        if len(data) < _SNAPSHOT_HEADER.size or data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path}: not a grid snapshot")
+        _, version, width, height, count = _SNAPSHOT_HEADER.unpack_from(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: snapshot format version {version} is not supported (expected {SNAPSHOT_VERSION})")
+
+        offset = _SNAPSHOT_HEADER.size
+        size = width * height
+        expected = offset + count * _SNAPSHOT_POINT.size + (size + 7) // 8 + size
+        if len(data) != expected:
+            raise ValueError(f"{path}: snapshot holds {len(data)} bytes, expected {expected}")
+
+        points = []
+        for _ in range(count):
+            points.append(_SNAPSHOT_POINT.unpack_from(data, offset))
+            offset += _SNAPSHOT_POINT.size
+
+        grid = Grid(width, height, use_adjacency=use_adjacency)
+        view = memoryview(data)
+        bitmap = np.frombuffer(data, dtype=np.uint8, count=(size + 7) // 8, offset=offset)
+        step = BLOCK_BYTES // 8
+        for start in range(0, len(bitmap), step):
+            stop = min(size, (start + step) * 8)
+            grid.wall_map[start * 8:stop] = np.unpackbits(bitmap[start:start + step], count=stop - start * 8).tobytes()
+        offset += len(bitmap)
+        # Assigning through a memoryview copies without a temporary bytes object
+        memoryview(grid.weight_map)[:] = view[offset:offset + size]
+        # Views of the mapping must be gone before it is closed
+        del bitmap
+        view.release()
+
+    grid.touch_walls()
+    grid.touch_weights()
+    return grid, points
+
+
+def load_movingai_scen(path):
+    """
+    Load a MovingAI ``.scen`` file.
+
+    Returns:
+        List of dictionaries with bucket, map, width, height, start, goal and
+        optimal (the published octile-distance length, for reference only:
+        this project's six-direction move set gives different lengths).
+    """
+    scenarios = []
+    with open(path, "r", encoding="ascii") as handle:
+        for line in handle:
+            fields = line.split()
+            if not fields or fields[0] == "version":
+                continue
+            if len(fields) != 9:
+                raise ValueError(f"{path}: expected 9 fields per scenario, got {len(fields)}")
+            bucket, map_name, width, height, sx, sy, gx, gy, optimal = fields
+            scenarios.append({
+                "bucket": int(bucket),
+                "map": map_name,
+                "width": int(width),
+                "height": int(height),
+                "start": (int(sx), int(sy)),
+                "goal": (int(gx), int(gy)),
+                "optimal": float(optimal),
+            })
+    return scenarios
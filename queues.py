@@ -0,0 +1,250 @@
+"""
+Priority queue backends for uniform cost search.
+
+Every backend stores node ids under non-negative integer priorities and
+offers the same interface:
+
+    queue = BucketQueue(grid.size, max_weight)
+    queue.push(node, priority)   # True if the node was not queued before
+    priority, node = queue.pop()
+    len(queue)
+
+HeapQueue and the monotone BucketQueue/RadixHeap keep stale duplicates
+(lazy deletion), so callers skip nodes they have already settled.
+IndexedHeap updates an entry in place (decrease-key) and never returns
+stale entries. BucketQueue and RadixHeap are monotone: a push must not go
+below the last popped priority, which Dijkstra with non-negative weights
+guarantees.
+"""
+
+from array import array
+import heapq
+
+
+class HeapQueue:
+    """Binary heap of (priority, node) pairs on top of heapq."""
+
+    __slots__ = ("_heap",)
+
+    def __init__(self, size=0, max_weight=0):
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, node, priority):
+        heapq.heappush(self._heap, (priority, node))
+        return True
+
+    def pop(self):
+        return heapq.heappop(self._heap)
+
+
+class BucketQueue:
+    """
+    Dial's bucket queue: one bucket per priority modulo ``max_weight + 1``.
+
+    All queued priorities lie within ``max_weight`` of the last popped one,
+    so a circular array of that many buckets holds them without collisions
+    and pop only scans forward to the next non-empty bucket.
+    """
+
+    __slots__ = ("_buckets", "_cursor", "_size")
+
+    def __init__(self, size=0, max_weight=1):
+        self._buckets = [[] for _ in range(max_weight + 1)]
+        self._cursor = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, node, priority):
+        buckets = self._buckets
+        buckets[priority % len(buckets)].append(node)
+        self._size += 1
+        return True
+
+    def pop(self):
+        if not self._size:
+            raise IndexError("pop from an empty queue")
+        buckets = self._buckets
+        count = len(buckets)
+        cursor = self._cursor
+        bucket = buckets[cursor % count]
+        while not bucket:
+            cursor += 1
+            bucket = buckets[cursor % count]
+        self._cursor = cursor
+        self._size -= 1
+        return cursor, bucket.pop()
+
+
+class RadixHeap:
+    """
+    Monotone radix heap keyed by the highest bit that differs from the last pop.
+
+    Bucket ``i`` holds priorities whose XOR with the last popped priority
+    has bit length ``i``. Popping from an empty bucket 0 refills it by
+    redistributing the first non-empty bucket around its minimum, so each
+    entry moves down at most once per bit of the priority range.
+    """
+
+    __slots__ = ("_buckets", "_last", "_size")
+
+    def __init__(self, size=0, max_weight=0):
+        self._buckets = [[] for _ in range(65)]
+        self._last = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, node, priority):
+        self._buckets[(priority ^ self._last).bit_length()].append((priority, node))
+        self._size += 1
+        return True
+
+    def pop(self):
+        if not self._size:
+            raise IndexError("pop from an empty queue")
+        buckets = self._buckets
+        if not buckets[0]:
+            index = 1
+            while not buckets[index]:
+                index += 1
+            entries = buckets[index]
+            buckets[index] = []
+            last = min(entries)[0]
+            self._last = last
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self._size -= 1
+        return buckets[0].pop()
+
+
+class IndexedHeap:
+    """
+    Binary heap of node ids with a position index, supporting decrease-key.
+
+    Each node is queued at most once; pushing a queued node with a lower
+    priority moves it up in place, and pushing it with a higher one is
+    ignored.
+    """
+
+    __slots__ = ("_heap", "_position", "_priority")
+
+    def __init__(self, size, max_weight=0):
+        self._heap = []
+        self._position = array("i", [-1]) * size
+        self._priority = array("q", [0]) * size
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, node, priority):
+        position = self._position[node]
+        if position < 0:
+            self._priority[node] = priority
+            self._heap.append(node)
+            self._sift_up(len(self._heap) - 1, node, priority)
+            return True
+        if priority < self._priority[node]:
+            self._priority[node] = priority
+            self._sift_up(position, node, priority)
+        return False
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        self._position[top] = -1
+        if heap:
+            self._sift_down(last, self._priority[last])
+        return self._priority[top], top
+
+    def _sift_up(self, index, node, priority):
+        heap = self._heap
+        position = self._position
+        keys = self._priority
+        while index:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if keys[parent] <= priority:
+                break
+            heap[index] = parent
+            position[parent] = index
+            index = parent_index
+        heap[index] = node
+        position[node] = index
+
+    def _sift_down(self, node, priority):
+        heap = self._heap
+        position = self._position
+        keys = self._priority
+        size = len(heap)
+        index = 0
+        child_index = 1
+        while child_index < size:
+            child = heap[child_index]
+            right_index = child_index + 1
+            if right_index < size and keys[heap[right_index]] < keys[child]:
+                child_index = right_index
+                child = heap[child_index]
+            if priority <= keys[child]:
+                break
+            heap[index] = child
+            position[child] = index
+            index = child_index
+            child_index = 2 * index + 1
+        heap[index] = node
+        position[node] = index
+
+
+QUEUE_BACKENDS = {
+    "heapq": HeapQueue,
+    "dial": BucketQueue,
+    "radix": RadixHeap,
+    "indexed": IndexedHeap,
+}
+
+
+# Largest cell weight for which select_queue prefers the bucket queue.
+DIAL_MAX_WEIGHT = 64
+
+
+def select_queue(grid, max_weight=None):
+    """
+    Pick the fastest backend name for searching ``grid``.
+
+    Cell weights are bytes, so Dial's bucket queue always applies; it only
+    loses to heapq when the bucket ring is mostly empty, i.e. when weights
+    span a wide range. Pass ``max_weight`` when it is already known to
+    skip scanning the weights again.
+    """
+    if max_weight is None:
+        max_weight = grid.weight_range()[1]
+    return "dial" if max_weight <= DIAL_MAX_WEIGHT else "heapq"
+
+
+def new_queue(grid, backend=None):
+    """
+    Create a queue for a search on ``grid``.
+
+    Args:
+        grid: Grid object containing the environment
+        backend: Name from QUEUE_BACKENDS, a backend class, or None to let
+            select_queue decide
+
+    Returns:
+        Empty queue instance
+    """
+    max_weight = grid.weight_range()[1]
+    if backend is None:
+        backend = select_queue(grid, max_weight)
+    if isinstance(backend, str):
+        try:
+            backend = QUEUE_BACKENDS[backend]
+        except KeyError:
+            raise ValueError(f"Unknown queue backend: {backend!r}") from None
+    return backend(grid.size, max(1, max_weight))
@@ -0,0 +1,557 @@
+"""
+Compact binary traces of search runs for offline replay.
+
+A TraceWriter stands in for the visualizer of any *_search function (or of
+search_by_name) and streams the step engine's (kind, node_id) events to a
+file instead of drawing them, so long runs on big maps can be captured
+headless and replayed later with TraceReader.
+
+Each event is one varint holding ``zigzag(node - previous node) << 3 | kind``.
+Searches mostly step between neighboring cells, so an event takes one to
+three bytes before the optional zlib pass. Events are buffered in arrays
+and encoded with NumPy a chunk at a time, which keeps recording close to
+the speed of a run with events on and nothing attached.
+
+File layout:
+    header  TRACE_MAGIC, format version, flags, width, height, start and
+            goal node ids (_TRACE_HEADER), then a length-prefixed UTF-8
+            label (the algorithm name) and, with FLAG_WALLS, the grid's
+            walls as a packed bitmap so a replay can draw the map
+    body    the event varints, then END_RECORD, the path length and the
+            path's node ids as zigzag deltas; zlib-compressed when
+            FLAG_ZLIB is set
+
+A run killed before the search returned leaves a trace without the
+END_RECORD; its events stay readable and TraceReader.path is None.
+
+TraceTimeline decodes a whole trace with frontier keyframes so a
+TraceCursor can seek to any step, forwards or backwards, without replaying
+from the first event; main.py --replay draws it.
+
+Usage:
+    with TraceWriter("bfs.trace", grid, start, goal) as trace:
+        path, visited = bfs_search(grid, start, goal, visualizer=trace)
+    reader = TraceReader("bfs.trace")
+    kinds, nodes = reader.read_events()
+    cursor = TraceCursor(TraceTimeline(reader))
+    cursor.seek(1000000)  # cursor.visited / cursor.frontier flag buffers
+
+Run from the project root:
+    python search_trace.py record bfs --map arena.map --start 1,1 --goal 200,180 -o bfs.trace
+    python search_trace.py info bfs.trace
+"""
+
+from array import array
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from algorithms import EXPAND, FOUND, POP, PUSH, VISIT, search_by_name
+from grid import Grid
+from maps import load_map
+
+TRACE_MAGIC = b"GRIDTRAC"
+TRACE_VERSION = 2
+_TRACE_HEADER = struct.Struct("<8sIIIIQQ")
+_TRACE_LABEL = struct.Struct("<H")
+
+# Header flags: the body is one zlib stream; a wall bitmap follows the label.
+FLAG_ZLIB = 1
+FLAG_WALLS = 2
+
+# Low three bits of an event varint; event kinds (algorithms.EXPAND ... FOUND)
+# stay below END_RECORD, which marks the start of the path trailer.
+KIND_BITS = 3
+END_RECORD = 7
+
+# Events buffered before a chunk is encoded, and body bytes read per block.
+TRACE_CHUNK = 1 << 16
+READ_BLOCK = 1 << 20
+
+# Events between TraceTimeline frontier keyframes; bounds the work of a seek.
+KEYFRAME_INTERVAL = 1 << 16
+
+KIND_NAMES = {EXPAND: "expand", PUSH: "push", POP: "pop", VISIT: "visit", FOUND: "found"}
+
+
+def encode_varints(values):
+    """Encode a uint64 NumPy array as LEB128 varints (7 bits per byte, low bits first)."""
+    if not len(values):
+        return b""
+    sizes = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        sizes += values >= np.uint64(1 << shift)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    out = np.empty(int(ends[-1]), dtype=np.uint8)
+    for index in range(int(sizes.max())):
+        mask = sizes > index
+        low = (values[mask] >> np.uint64(7 * index)) & np.uint64(0x7F)
+        more = (sizes[mask] > index + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + index] = low | more
+    return out.tobytes()
+
+
+def decode_varints(data):
+    """
+    Decode the complete varints at the start of ``data``.
+
+    Returns:
+        values: uint64 NumPy array
+        used: Number of bytes consumed; a varint cut off at the end is left over
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    if not len(ends):
+        return np.zeros(0, dtype=np.uint64), 0
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    sizes = ends - starts + 1
+    values = np.zeros(len(ends), dtype=np.uint64)
+    for index in range(int(sizes.max())):
+        mask = sizes > index
+        low = (raw[starts[mask] + index] & 0x7F).astype(np.uint64)
+        values[mask] |= low << np.uint64(7 * index)
+    return values, int(ends[-1]) + 1
+
+
+def _zigzag(deltas):
+    # Map signed deltas to unsigned so small steps either way stay small.
+    return ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values):
+    values = values.astype(np.int64)
+    return (values >> 1) ^ -(values & 1)
+
+
+class TraceWriter:
+    """
+    Record a search's events to a trace file.
+
+    Pass the writer as the ``visualizer`` of a *_search function or of
+    algorithms.search_by_name; play() records every event and, once the
+    search returns, the path, then closes the file. Events can also be fed
+    by hand with record() and finish().
+
+    Attributes:
+        events: Number of events recorded so far
+        nbytes: Bytes written to the file so far
+    """
+
+    def __init__(self, path, grid, start, goal, compress=True, level=6, label="", walls=True):
+        self.grid = grid
+        self.events = 0
+        flags = (FLAG_ZLIB if compress else 0) | (FLAG_WALLS if walls else 0)
+        label = label.encode("utf-8")
+        header = [
+            _TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, flags, grid.width, grid.height, grid.node_id(start), grid.node_id(goal)),
+            _TRACE_LABEL.pack(len(label)),
+            label,
+        ]
+        if walls:
+            header.append(np.packbits(np.frombuffer(grid.wall_map, dtype=np.uint8)).tobytes())
+        self._handle = open(path, "wb")
+        self._handle.writelines(header)
+        self.nbytes = sum(map(len, header))
+        self._compressor = zlib.compressobj(level) if compress else None
+        self._kinds = array("B")
+        self._nodes = array("q")
+        # The first event (the start node entering the frontier) encodes as a zero delta
+        self._previous = grid.node_id(start)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._handle.closed
+
+    def _write(self, data):
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._handle.write(data)
+        self.nbytes += len(data)
+
+    def _flush_events(self):
+        if not self._kinds:
+            return
+        nodes = np.frombuffer(self._nodes, dtype=np.int64)
+        deltas = np.diff(nodes, prepend=np.int64(self._previous))
+        values = (_zigzag(deltas) << np.uint64(KIND_BITS)) | np.frombuffer(self._kinds, dtype=np.uint8)
+        self._write(encode_varints(values))
+        self._previous = self._nodes[-1]
+        self.events += len(self._kinds)
+        # Clear in place so bound append methods held by play stay valid
+        del nodes
+        del self._kinds[:]
+        del self._nodes[:]
+
+    def record(self, kind, node):
+        """Append one (kind, node_id) event."""
+        self._kinds.append(kind)
+        self._nodes.append(node)
+        if len(self._kinds) >= TRACE_CHUNK:
+            self._flush_events()
+
+    def play(self, steps, start, goal, delay=0):
+        """
+        Drive a step engine to completion, recording its events.
+
+        Matches GridVisualizer.play so the writer can replace it; ``delay``
+        is ignored.
+
+        Returns:
+            The step engine's result; its first item (the path) is written
+            as the trace's trailer
+        """
+        kinds = self._kinds
+        nodes = self._nodes
+        while True:
+            try:
+                kind, node = next(steps)
+            except StopIteration as stop:
+                self.finish(stop.value[0])
+                return stop.value
+            kinds.append(kind)
+            nodes.append(node)
+            if len(kinds) >= TRACE_CHUNK:
+                self._flush_events()
+
+    def finish(self, path):
+        """Write the END_RECORD and ``path`` (a list of (x, y) tuples), then close."""
+        self._flush_events()
+        node_ids = np.array([self.grid.node_id(cell) for cell in path], dtype=np.int64)
+        trailer = np.concatenate((
+            np.array([END_RECORD, len(node_ids)], dtype=np.uint64),
+            _zigzag(np.diff(node_ids, prepend=np.int64(0))),
+        ))
+        self._write(encode_varints(trailer))
+        self.close()
+
+    def close(self):
+        """Flush buffered events and close the file; without finish() the trace has no path."""
+        if self.closed:
+            return
+        self._flush_events()
+        if self._compressor is not None:
+            tail = self._compressor.flush()
+            self._handle.write(tail)
+            self.nbytes += len(tail)
+        self._handle.close()
+
+
+class TraceReader:
+    """
+    Read a trace written by TraceWriter.
+
+    Attributes:
+        width, height: Grid size the trace was recorded on
+        start, goal: (x, y) endpoints of the search
+        label: Algorithm name given when recording ("" if none)
+        walls: bytearray wall map (one byte per cell) of the recorded grid,
+            or None when the trace was written without walls
+        compressed: Whether the body is zlib-compressed
+        path: List of (x, y) tuples once the events have been read, or None
+            when the trace was cut short (or not read yet)
+    """
+
+    def __init__(self, path):
+        self.file_path = path
+        with open(path, "rb") as handle:
+            header = handle.read(_TRACE_HEADER.size)
+            if len(header) < _TRACE_HEADER.size or header[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+                raise ValueError(f"{path}: not a search trace")
+            _, version, flags, width, height, start_id, goal_id = _TRACE_HEADER.unpack(header)
+            if version != TRACE_VERSION:
+                raise ValueError(f"{path}: trace format version {version} is not supported (expected {TRACE_VERSION})")
+            (length,) = _TRACE_LABEL.unpack(handle.read(_TRACE_LABEL.size))
+            self.label = handle.read(length).decode("utf-8")
+            self.walls = None
+            if flags & FLAG_WALLS:
+                size = width * height
+                packed = np.frombuffer(handle.read((size + 7) // 8), dtype=np.uint8)
+                self.walls = bytearray(np.unpackbits(packed, count=size).tobytes())
+            self._body_offset = handle.tell()
+        self.width = width
+        self.height = height
+        self.compressed = bool(flags & FLAG_ZLIB)
+        self.start = self.node_pos(start_id)
+        self.goal = self.node_pos(goal_id)
+        self.path = None
+
+    def node_pos(self, node):
+        y, x = divmod(node, self.width)
+        return (x, y)
+
+    def make_grid(self):
+        """Return a Grid of the recorded size with the recorded walls (open if none)."""
+        grid = Grid(self.width, self.height)
+        if self.walls is not None:
+            grid.wall_map[:] = self.walls
+            grid.touch_walls()
+        return grid
+
+    def _blocks(self):
+        decompressor = zlib.decompressobj() if self.compressed else None
+        with open(self.file_path, "rb") as handle:
+            handle.seek(self._body_offset)
+            while True:
+                block = handle.read(READ_BLOCK)
+                if not block:
+                    break
+                yield decompressor.decompress(block) if decompressor else block
+            if decompressor:
+                yield decompressor.flush()
+
+    def chunks(self):
+        """
+        Yield the events as (kinds, nodes) NumPy array pairs, one per block.
+
+        Sets ``path`` once the trailer has been read.
+        """
+        self.path = None
+        previous = self.start[1] * self.width + self.start[0]
+        pending = b""
+        trailer = None
+        for block in self._blocks():
+            data = pending + block
+            values, used = decode_varints(data)
+            pending = data[used:]
+            if trailer is not None:
+                trailer.extend(values.tolist())
+                continue
+            ends = np.flatnonzero((values & np.uint64(END_RECORD)) == END_RECORD)
+            if len(ends):
+                trailer = values[ends[0] + 1:].tolist()
+                values = values[:ends[0]]
+            if len(values):
+                kinds = (values & np.uint64(END_RECORD)).astype(np.uint8)
+                nodes = previous + np.cumsum(_unzigzag(values >> np.uint64(KIND_BITS)))
+                previous = int(nodes[-1])
+                yield kinds, nodes
+
+        if trailer:
+            count = trailer[0]
+            node_ids = np.cumsum(_unzigzag(np.array(trailer[1:count + 1], dtype=np.uint64)))
+            self.path = [self.node_pos(node) for node in node_ids.tolist()]
+
+    def read_events(self):
+        """Return every event as one (kinds uint8, nodes int64) NumPy array pair."""
+        kinds = []
+        nodes = []
+        for chunk_kinds, chunk_nodes in self.chunks():
+            kinds.append(chunk_kinds)
+            nodes.append(chunk_nodes)
+        if not kinds:
+            return np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int64)
+        return np.concatenate(kinds), np.concatenate(nodes)
+
+    def events(self):
+        """Yield (kind, node_id) tuples like a step engine's event stream."""
+        for kinds, nodes in self.chunks():
+            yield from zip(kinds.tolist(), nodes.tolist())
+
+
+class TraceTimeline:
+    """
+    Random-access view of a whole trace for scrubbing and reverse playback.
+
+    The events are decoded once into arrays. A cell's visited flag never
+    clears, so the step of its first VISIT answers "visited at step t"
+    directly. The frontier (a multiset, since lazy-deletion queues push a
+    cell more than once) is stored as sparse keyframes of per-cell push
+    minus pop counts every ``keyframe_interval`` events; any step is
+    rebuilt from the nearest earlier keyframe plus fewer than
+    ``keyframe_interval`` events, so seeking never replays from step zero.
+
+    A step counts applied events: step 0 is before the first event and
+    step ``count`` after the last.
+
+    Attributes:
+        count: Number of events
+        kinds, nodes: Event kind and node id arrays
+        expansions: Event indexes of the EXPAND events, ascending
+        first_visit: Per-cell index of its first VISIT event (count if never)
+        path: (x, y) tuples of the recorded path (empty if none or cut short)
+    """
+
+    def __init__(self, reader, keyframe_interval=KEYFRAME_INTERVAL):
+        self.reader = reader
+        self.width = reader.width
+        self.height = reader.height
+        self.size = reader.width * reader.height
+        self.start = reader.start
+        self.goal = reader.goal
+        self.keyframe_interval = keyframe_interval
+
+        kinds, nodes = reader.read_events()
+        self.count = len(kinds)
+        self.kinds = kinds
+        self.nodes = nodes.astype(np.int32) if self.size < 1 << 31 else nodes
+        self.path = reader.path or []
+        self.expansions = np.flatnonzero(kinds == EXPAND)
+
+        index_type = np.int32 if self.count < (1 << 31) - 1 else np.int64
+        self.first_visit = np.full(self.size, self.count, dtype=index_type)
+        visits = np.flatnonzero(kinds == VISIT)
+        cells, first = np.unique(self.nodes[visits], return_index=True)
+        self.first_visit[cells] = visits[first]
+
+        # Keyframe k holds the nonzero frontier counts at step k * keyframe_interval
+        counts = np.zeros(self.size, dtype=np.int32)
+        self._keyframes = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32))]
+        for step in range(keyframe_interval, self.count + 1, keyframe_interval):
+            self.apply_frontier(counts, step - keyframe_interval, step)
+            cells = np.flatnonzero(counts)
+            self._keyframes.append((cells, counts[cells]))
+
+    def apply_frontier(self, counts, low, high, sign=1):
+        """Add (or with ``sign`` -1, remove) the frontier changes of events low..high-1 to ``counts``."""
+        kinds = self.kinds[low:high]
+        nodes = self.nodes[low:high]
+        np.add.at(counts, nodes[kinds == PUSH], sign)
+        np.add.at(counts, nodes[kinds == POP], -sign)
+
+    def frontier_counts(self, step, out):
+        """Fill ``out`` (int32, one entry per cell) with the frontier counts at ``step``."""
+        base = step // self.keyframe_interval
+        cells, values = self._keyframes[base]
+        out[:] = 0
+        out[cells] = values
+        self.apply_frontier(out, base * self.keyframe_interval, step)
+
+    def current_at(self, step):
+        """Node id of the last node expanded before ``step``, or None."""
+        index = int(np.searchsorted(self.expansions, step)) - 1
+        return int(self.nodes[self.expansions[index]]) if index >= 0 else None
+
+    def expansion_step(self, step, offset):
+        """
+        Step just after the expansion ``offset`` expansions from the one
+        shown at ``step`` (one-event-per-frame stepping like the live play).
+        """
+        index = int(np.searchsorted(self.expansions, step)) - 1 + offset
+        if index < 0:
+            return 0
+        if index >= len(self.expansions):
+            return self.count
+        return int(self.expansions[index]) + 1
+
+
+class TraceCursor:
+    """
+    Search state at one step of a TraceTimeline, moved with seek().
+
+    ``visited`` and ``frontier`` are per-cell flag bytearrays updated in
+    place, so grid.NodeSet views over them stay valid across seeks.
+
+    Attributes:
+        step: Current step
+        current: Node id being expanded at ``step``, or None
+    """
+
+    def __init__(self, timeline):
+        self.timeline = timeline
+        self.step = 0
+        self.current = None
+        self.visited = bytearray(timeline.size)
+        self.frontier = bytearray(timeline.size)
+        self._counts = np.zeros(timeline.size, dtype=np.int32)
+        self._visited = np.frombuffer(self.visited, dtype=np.uint8)
+        self._frontier = np.frombuffer(self.frontier, dtype=np.uint8)
+
+    def seek(self, step):
+        """
+        Move to ``step`` (clamped to the trace).
+
+        Short moves either way apply just the events in between; longer ones
+        rebuild from the nearest keyframe and diff the flags.
+
+        Returns:
+            Array of the node ids whose flags may have changed
+        """
+        timeline = self.timeline
+        step = max(0, min(step, timeline.count))
+        low, high = sorted((self.step, step))
+        if high - low <= timeline.keyframe_interval:
+            timeline.apply_frontier(self._counts, low, high, 1 if step > self.step else -1)
+            changed = np.unique(timeline.nodes[low:high])
+            self._frontier[changed] = self._counts[changed] > 0
+            self._visited[changed] = timeline.first_visit[changed] < step
+        else:
+            before = self._visited + (self._frontier << 1)
+            timeline.frontier_counts(step, self._counts)
+            np.greater(self._counts, 0, out=self._frontier, casting="unsafe")
+            np.less(timeline.first_visit, step, out=self._visited, casting="unsafe")
+            changed = np.flatnonzero(before != self._visited + (self._frontier << 1))
+        self.step = step
+        self.current = timeline.current_at(step)
+        return changed
+
+
+def record_search(algorithm, grid, start, goal, path, depth_limit=None, compress=True):
+    """
+    Run a search by name while recording its trace to ``path``.
+
+    Returns:
+        The search's (path, visited) result
+    """
+    with TraceWriter(path, grid, start, goal, compress, label=algorithm) as trace:
+        return search_by_name(algorithm, grid, start, goal, depth_limit, visualizer=trace)
+
+
+def _parse_cell(text):
+    x, _, y = text.partition(",")
+    return (int(x), int(y))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and inspect search traces.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Run one search headless and record its trace")
+    record.add_argument("algorithm", help="Algorithm name as accepted by search_by_name")
+    record.add_argument("--map", required=True, help="Map file (MovingAI, PBM/PGM bitmap or grid snapshot)")
+    record.add_argument("--start", type=_parse_cell, required=True, help="Start cell as x,y")
+    record.add_argument("--goal", type=_parse_cell, required=True, help="Goal cell as x,y")
+    record.add_argument("--depth-limit", type=int, default=None, help="Depth limit for dls")
+    record.add_argument("--output", "-o", default="search.trace", help="Trace file to write")
+    record.add_argument("--no-compress", action="store_true", help="Skip the zlib pass")
+    info = commands.add_parser("info", help="Summarize a trace file")
+    info.add_argument("trace")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        grid = load_map(args.map)
+        start_time = time.perf_counter()
+        with TraceWriter(args.output, grid, args.start, args.goal, compress=not args.no_compress, label=args.algorithm) as trace:
+            path, visited = search_by_name(args.algorithm, grid, args.start, args.goal, args.depth_limit, visualizer=trace)
+        seconds = time.perf_counter() - start_time
+        print(
+            f"{args.algorithm}: path {len(path)}, visited {len(visited)}, {trace.events} events "
+            f"in {seconds:.2f} s -> {args.output} ({trace.nbytes / max(1, trace.events):.2f} bytes/event)"
+        )
+        return 0
+
+    reader = TraceReader(args.trace)
+    kinds, nodes = reader.read_events()
+    counts = np.bincount(kinds, minlength=len(KIND_NAMES))
+    print(f"{reader.label or 'search'} on {reader.width} x {reader.height} grid, {reader.start} -> {reader.goal}, {'zlib' if reader.compressed else 'raw'}")
+    print(", ".join(f"{KIND_NAMES[kind]} {counts[kind]}" for kind in sorted(KIND_NAMES)))
+    if reader.path is None:
+        print("trace cut short: no result recorded")
+    else:
+        print(f"path {len(reader.path)} cells" if reader.path else "no path found")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
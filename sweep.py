@@ -0,0 +1,332 @@
+"""
+Headless parameter sweeps over setup-screen configurations.
+
+A sweep spec maps every key of the UIManager._validate dictionary to a list
+of values; the cartesian product of those lists is run over a process pool
+and each result is appended to a JSON-lines file as soon as it completes.
+Rerunning the same sweep on the same output file skips the configurations
+that already have a result.
+
+Run from the project root:
+    python sweep.py spec.json --output results.jsonl
+    python sweep.py spec.json --output results.jsonl --workers 16 --chunksize 8
+    python sweep.py spec.json --output results.jsonl --grid-cache grids/
+
+Example spec.json:
+    {
+        "algorithm": ["bfs", "ucs", "dls"],
+        "grid_width": [20, 40, 80],
+        "grid_height": [15, 30, 60],
+        "start": [[0, 0], [1, 1]],
+        "goal": [[7, 7]],
+        "depth_limit": [10, 50],
+        "seed": [0, 1, 2]
+    }
+
+``depth_limit`` only applies to DLS and ``seed`` (the weight draw) only to
+the weighted searches (algorithms.WEIGHTED_ALGORITHMS), so the product is
+deduplicated for the others. Weighted searches need an integer seed; a
+null one is reported as an error.
+
+With ``--grid-cache`` every grid a worker builds is saved as a snapshot
+(maps.save_snapshot) named after its grid key, and later chunks or sweeps
+load it instead of redrawing the walls and per-cell random weights.
+"""
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+from algorithms import WEIGHTED_ALGORITHMS, path_cost, search_by_name
+from maps import build_config_grid, load_snapshot, save_snapshot
+
+# Keys of a sweep configuration, in output order. The first six are the
+# UIManager._validate keys; seed fixes the random weights of weighted searches.
+CONFIG_KEYS = ("algorithm", "grid_width", "grid_height", "start", "goal", "depth_limit", "seed")
+
+DEFAULTS = {"depth_limit": [None], "seed": [0]}
+
+
+def normalize_config(config):
+    """
+    Return a config with tuple coordinates and unused axes set to None.
+
+    Configs that differ only in an axis their algorithm ignores normalize to
+    the same dictionary, which is what deduplication and resume key on.
+    """
+    config = {key: config.get(key) for key in CONFIG_KEYS}
+    config["start"] = tuple(config["start"])
+    config["goal"] = tuple(config["goal"])
+    if config["algorithm"] != "dls":
+        config["depth_limit"] = None
+    if config["algorithm"] not in WEIGHTED_ALGORITHMS:
+        config["seed"] = None
+    return config
+
+
+def config_key(config):
+    """Stable string key of a normalized config, used to match resumed results."""
+    return json.dumps([list(value) if isinstance(value, tuple) else value for value in config.values()])
+
+
+def expand_spec(spec):
+    """
+    Expand a sweep spec into the list of distinct normalized configs.
+
+    Args:
+        spec: Dictionary mapping config keys to lists of values; depth_limit
+            and seed may be omitted
+
+    Returns:
+        configs: List of config dictionaries in product order
+    """
+    unknown = set(spec) - set(CONFIG_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown sweep keys: {sorted(unknown)}")
+    axes = []
+    for key in CONFIG_KEYS:
+        values = spec.get(key, DEFAULTS.get(key))
+        if values is None:
+            raise ValueError(f"Sweep spec is missing {key!r}")
+        axes.append(values)
+
+    configs = []
+    seen = set()
+    for values in itertools.product(*axes):
+        config = normalize_config(dict(zip(CONFIG_KEYS, values)))
+        key = config_key(config)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def validate_config(config):
+    """Apply the setup screen's checks; return an error message or None."""
+    width = config["grid_width"]
+    height = config["grid_height"]
+    sx, sy = config["start"]
+    gx, gy = config["goal"]
+    if width < 1 or height < 1:
+        return "Grid width and height must be positive"
+    if not (0 <= sx < width and 0 <= sy < height):
+        return "Start must be within grid bounds"
+    if not (0 <= gx < width and 0 <= gy < height):
+        return "Goal must be within grid bounds"
+    if (sx, sy) == (gx, gy):
+        return "Start and goal cannot be the same"
+    if config["algorithm"] == "dls" and (config["depth_limit"] is None or config["depth_limit"] < 0):
+        return "Depth limit must be >= 0"
+    if config["algorithm"] in WEIGHTED_ALGORITHMS and config["seed"] is None:
+        # A null seed would draw the weights from the global random module,
+        # so neither the result nor a cached grid could be reproduced.
+        return "Weighted algorithms need a seed"
+    return None
+
+
+def run_config(config, grid=None):
+    """
+    Run one configuration and return its result record.
+
+    Returns:
+        Dictionary with the config plus found, path_length, cost, visited,
+        seconds and error (None on success)
+    """
+    record = dict(config)
+    record.update({"found": False, "path_length": 0, "cost": None, "visited": 0, "seconds": 0.0})
+    record["error"] = validate_config(config)
+    if record["error"] is not None:
+        return record
+
+    if grid is None:
+        rng = random.Random(config["seed"]) if config["seed"] is not None else None
+        grid = build_config_grid(config, rng)
+
+    start_time = time.perf_counter()
+    try:
+        path, visited = search_by_name(config["algorithm"], grid, config["start"], config["goal"], config["depth_limit"])
+    except ValueError as error:
+        record["error"] = str(error)
+        return record
+    record["seconds"] = time.perf_counter() - start_time
+    record["found"] = bool(path)
+    record["path_length"] = len(path)
+    record["cost"] = path_cost(grid, path) if path else None
+    record["visited"] = len(visited)
+    return record
+
+
+def _grid_key(config):
+    return (config["grid_width"], config["grid_height"], config["start"], config["goal"], config["algorithm"] in WEIGHTED_ALGORITHMS, config["seed"])
+
+
+def snapshot_name(config):
+    """File name of the grid snapshot for a normalized config (see build_sweep_grid)."""
+    width, height, (sx, sy), (gx, gy), weighted, seed = _grid_key(config)
+    weights = f"seed{seed}" if weighted else "unweighted"
+    return f"{width}x{height}_s{sx}-{sy}_g{gx}-{gy}_{weights}.grid"
+
+
+def build_sweep_grid(config, grid_cache=None):
+    """
+    Build the grid for a normalized config.
+
+    Args:
+        config: Config dictionary (see normalize_config)
+        grid_cache: Optional directory of grid snapshots; a cached grid is
+            loaded instead of rebuilt, and a newly built one is saved there
+
+    Returns:
+        Grid object
+    """
+    path = os.path.join(grid_cache, snapshot_name(config)) if grid_cache else None
+    if path and os.path.exists(path):
+        return load_snapshot(path)[0]
+
+    rng = random.Random(config["seed"]) if config["seed"] is not None else None
+    grid = build_config_grid(config, rng)
+    if path:
+        # Write under a per-process name so concurrent workers never read a partial file
+        os.makedirs(grid_cache, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        save_snapshot(grid, temporary, [config["start"], config["goal"]])
+        os.replace(temporary, path)
+    return grid
+
+
+def _run_chunk(configs, grid_cache=None):
+    # Consecutive configs often share a grid (only the algorithm or depth
+    # differs), so the worker keeps the last one it built.
+    results = []
+    last_key = None
+    grid = None
+    for config in configs:
+        key = _grid_key(config)
+        if key != last_key and validate_config(config) is None:
+            grid = build_sweep_grid(config, grid_cache)
+            last_key = key
+        results.append(run_config(config, grid if key == last_key else None))
+    return results
+
+
+def load_completed(output):
+    """
+    Read the keys of configs that already have a result in ``output``.
+
+    A trailing partial line (from a run killed mid-write) is cut off so new
+    results start on a clean line.
+    """
+    completed = set()
+    if not os.path.exists(output):
+        return completed
+
+    with open(output, "rb+") as handle:
+        data = handle.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            handle.truncate(end)
+
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        completed.add(config_key(normalize_config(record)))
+    return completed
+
+
+def run_sweep(configs, output, workers=None, chunksize=None, resume=True, progress=None, grid_cache=None):
+    """
+    Run configs over a process pool, streaming results to a JSON-lines file.
+
+    Args:
+        configs: Iterable of config dictionaries (see expand_spec)
+        output: Path of the JSON-lines results file
+        workers: Worker process count (default: os.cpu_count())
+        chunksize: Configs per task (default: enough for ~4 tasks per worker)
+        resume: Skip configs already present in ``output`` instead of
+            overwriting it
+        progress: Optional callable(done, total) called after each chunk
+        grid_cache: Optional directory of grid snapshots shared by the
+            workers (see build_sweep_grid)
+
+    Returns:
+        stats: Dictionary with total, skipped, completed, errors and seconds
+    """
+    configs = [normalize_config(config) for config in configs]
+    completed = load_completed(output) if resume else set()
+    pending = [config for config in configs if config_key(config) not in completed]
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(pending) // (workers * 4))
+    chunks = [pending[i:i + chunksize] for i in range(0, len(pending), chunksize)]
+
+    start_time = time.perf_counter()
+    done = 0
+    errors = 0
+    with open(output, "a" if resume else "w", encoding="utf-8") as handle:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep only a bounded number of chunks in flight so huge sweeps
+            # do not queue every pickled task up front.
+            chunk_iter = iter(chunks)
+            in_flight = set()
+            for chunk in itertools.islice(chunk_iter, workers * 2):
+                in_flight.add(executor.submit(_run_chunk, chunk, grid_cache))
+
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for record in future.result():
+                        handle.write(json.dumps(record) + "\n")
+                        done += 1
+                        errors += record["error"] is not None
+                    handle.flush()
+                    next_chunk = next(chunk_iter, None)
+                    if next_chunk is not None:
+                        in_flight.add(executor.submit(_run_chunk, next_chunk, grid_cache))
+                    if progress is not None:
+                        progress(done, len(pending))
+
+    return {
+        "total": len(configs),
+        "skipped": len(configs) - len(pending),
+        "completed": done,
+        "errors": errors,
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a headless parameter sweep over search configurations.")
+    parser.add_argument("spec", help="JSON file mapping config keys to lists of values")
+    parser.add_argument("--output", "-o", default="sweep_results.jsonl", help="JSON-lines results file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=None, help="Configs per worker task")
+    parser.add_argument("--fresh", action="store_true", help="Overwrite the output instead of resuming")
+    parser.add_argument("--grid-cache", default=None, help="Directory to keep grid snapshots in across chunks and runs")
+    args = parser.parse_args(argv)
+
+    with open(args.spec, "r", encoding="utf-8") as handle:
+        configs = expand_spec(json.load(handle))
+
+    def report(done, total):
+        print(f"\r{done}/{total} configurations", end="", flush=True)
+
+    stats = run_sweep(
+        configs, args.output, args.workers, args.chunksize,
+        resume=not args.fresh, progress=report, grid_cache=args.grid_cache,
+    )
+    print(
+        f"\n{stats['completed']} run, {stats['skipped']} already done, "
+        f"{stats['errors']} errors in {stats['seconds']:.1f}s -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
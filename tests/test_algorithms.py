@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from algorithms import UNREACHED, dls_steps, run_steps, shortest_path_tree
+from grid import Grid
+
+
+def make_grid(seed, width=9, height=7, density=0.25):
+    rng = random.Random(seed)
+    grid = Grid(width, height)
+    for node in range(grid.size):
+        grid.wall_map[node] = rng.random() < density
+    grid.wall_map[0] = 0
+    grid.touch_walls()
+    return grid
+
+
+def bfs_depths(grid, start_id):
+    """Fewest moves from ``start_id`` to every cell, or None where unreachable."""
+    came_from, depths, _ = shortest_path_tree(grid, start_id)
+    return [depths[node] if came_from[node] != UNREACHED else None for node in range(grid.size)]
+
+
+def assert_valid_path(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for cell, next_cell in zip(path, path[1:]):
+        assert grid.node_id(next_cell) in grid.neighbor_ids(grid.node_id(cell))
+
+
+@pytest.mark.parametrize("prune", [False, True])
+@pytest.mark.parametrize("seed", range(8))
+def test_dls_finds_goal_exactly_within_the_limit(seed, prune):
+    grid = make_grid(seed)
+    start = (0, 0)
+    depths = bfs_depths(grid, 0)
+    rng = random.Random(seed)
+    for goal_id in rng.sample(range(1, grid.size), 12):
+        goal = grid.node_pos(goal_id)
+        for depth_limit in range(0, 14, 3):
+            path, _ = run_steps(dls_steps(grid, start, goal, depth_limit, events=False, prune=prune))
+            depth = depths[goal_id]
+            assert bool(path) == (depth is not None and depth <= depth_limit), (goal, depth_limit)
+            if path:
+                assert len(path) - 1 <= depth_limit
+                assert_valid_path(grid, path, start, goal)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_plain_dls_explores_every_cell_within_the_limit(seed):
+    # Without pruning the search is uninformed: a goal out of reach still
+    # leaves every cell within the limit visited, not just the start.
+    grid = make_grid(seed)
+    goal = (grid.width - 1, grid.height - 1)
+    grid.walls.add(goal)
+    depths = bfs_depths(grid, 0)
+    for depth_limit in (1, 4, 9):
+        path, visited = run_steps(dls_steps(grid, (0, 0), goal, depth_limit, events=False))
+        within = {grid.node_pos(node) for node, depth in enumerate(depths) if depth is not None and depth <= depth_limit}
+        assert path == []
+        assert set(visited) == within
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from algorithms import bfs_search, path_cost, ucs_search
+from batch import batch_search
+from grid import Grid
+
+
+def make_grid(seed, width=9, height=7, density=0.2):
+    rng = random.Random(seed)
+    grid = Grid(width, height)
+    for node in range(grid.size):
+        grid.wall_map[node] = rng.random() < density
+        grid.weight_map[node] = rng.randint(1, 9)
+    grid.touch_walls()
+    grid.touch_weights()
+    return grid
+
+
+def reference(grid, algorithm, start, goal):
+    """(path, cost) from the single-query search batch_search should agree with."""
+    if not grid.is_passable(start) or not grid.is_passable(goal):
+        # The single searches still step out of a walled start; batch queries
+        # treat any walled endpoint as having no path.
+        return [], None
+    if algorithm == "bfs":
+        path = bfs_search(grid, start, goal)[0]
+        return path, len(path) - 1 if path else None
+    path = ucs_search(grid, start, goal)[0]
+    return path, path_cost(grid, path) if path else None
+
+
+def check_batch(grid, algorithm, queries, grouped_by):
+    results, stats = batch_search(grid, queries, algorithm, allow_reverse=grouped_by == "goal")
+    assert stats["grouped_by"] == grouped_by
+    for (start, goal), (path, cost) in zip(queries, results):
+        expected_path, expected_cost = reference(grid, algorithm, start, goal)
+        assert cost == expected_cost, (start, goal)
+        assert bool(path) == bool(expected_path), (start, goal)
+        if path:
+            assert path[0] == start and path[-1] == goal
+            assert all(grid.is_passable(cell) for cell in path)
+
+
+def test_walled_goal_group_returns_no_paths():
+    grid = Grid(5, 3)
+    grid.walls.add((3, 1))
+    queries = [((0, 0), (3, 1)), ((4, 2), (3, 1)), ((0, 2), (3, 1))]
+    for algorithm in ("bfs", "ucs"):
+        results, stats = batch_search(grid, queries, algorithm)
+        assert stats["grouped_by"] == "goal"
+        assert results == [([], None)] * 3
+        assert stats["expanded"] == 0
+
+
+@pytest.mark.parametrize("algorithm", ["bfs", "ucs"])
+@pytest.mark.parametrize("seed", range(6))
+def test_walled_endpoints_match_single_searches(algorithm, seed):
+    grid = make_grid(seed)
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width)]
+    walled = [cell for cell in cells if not grid.is_passable(cell)]
+    open_cells = [cell for cell in cells if grid.is_passable(cell)]
+
+    # Shared goal (walled or open) for goal grouping, shared start for start grouping.
+    for root in (rng.choice(walled), rng.choice(open_cells)):
+        others = rng.sample(walled, 3) + rng.sample(open_cells, 5) + [root]
+        check_batch(grid, algorithm, [(other, root) for other in others], "goal")
+        check_batch(grid, algorithm, [(root, other) for other in others], "start")
@@ -0,0 +1,47 @@
+import random
+
+from algorithms import path_cost, ucs_search
+from grid import Grid
+from incremental import DStarLite
+
+
+def test_zero_weight_ties_still_reach_the_goal():
+    # Nodes 2 and 5 both have weight 0 and the same cost-to-goal.
+    grid = Grid(3, 3)
+    grid.weight_map[:] = bytes([1, 1, 0, 0, 1, 0, 0, 1, 1])
+    grid.touch_weights()
+    path, _ = DStarLite(grid, (0, 0), (2, 2)).replan()
+    expected = ucs_search(grid, (0, 0), (2, 2))[0]
+    assert path[0] == (0, 0) and path[-1] == (2, 2)
+    assert path_cost(grid, path) == path_cost(grid, expected)
+
+
+def test_zero_weight_edits_and_start_moves_match_ucs():
+    rng = random.Random(19)
+    for _ in range(300):
+        grid = Grid(7, 6)
+        for node in range(grid.size):
+            grid.weight_map[node] = rng.choice((0, 0, 1, 2, 5))
+            grid.wall_map[node] = rng.random() < 0.15
+        start, goal = (0, 0), (6, 5)
+        grid.wall_map[0] = grid.wall_map[-1] = 0
+        grid.touch_walls()
+        grid.touch_weights()
+        planner = DStarLite(grid, start, goal)
+        for _ in range(4):
+            path, _ = planner.replan()
+            expected = ucs_search(grid, start, goal)[0]
+            assert bool(path) == bool(expected)
+            if path:
+                assert path[0] == start and path[-1] == goal
+                assert len(set(path)) == len(path)
+                assert path_cost(grid, path) == path_cost(grid, expected)
+            if path and len(path) > 1 and rng.random() < 0.5:
+                start = path[1]
+                planner.move_start(start)
+            cell = (rng.randrange(grid.width), rng.randrange(grid.height))
+            if cell not in (start, goal):
+                if cell in grid.walls:
+                    grid.walls.discard(cell)
+                else:
+                    grid.walls.add(cell)
@@ -21,12 +21,13 @@ class UIManager:
         self.label_font = pygame.font.SysFont("Segoe UI", 17)
         self.button_font = pygame.font.SysFont("Segoe UI", 18, bold=True)
 
-        self.algorithms = ["bfs", "dfs", "ucs", "dls", "iddfs", "bidirectional"]
+        self.algorithms = ["bfs", "dfs", "ucs", "dls", "iddfs", "bidirectional", "bidirectional_ucs", "astar", "dstar_lite"]
         self.selected_algo_idx = 0
         self.error_text = ""
 
         self.fields = {}
         self.algo_buttons = []
+        self.algo_buttons_bottom = 0
         self.start_button = None
         self.exit_button = None
         self.grid_card = None
@@ -184,9 +185,14 @@ class UIManager:
         inner = self.algo_card.inner_rect()
         top = inner.y + 52
         btn_w = (inner.width - 14) // 2
-        btn_h = 44
+        rows = (len(self.algorithms) + 1) // 2
+        # Tighter rows once a fourth (and fifth) one is needed, to leave room
+        # for the preview.
+        btn_h = 44 if rows <= 3 else 36 if rows == 4 else 30
         col_gap = 14
-        row_gap = 12
+        row_gap = 12 if rows <= 3 else 8 if rows == 4 else 6
+
+        self.algo_buttons_bottom = top + rows * (btn_h + row_gap) - row_gap
 
         new_buttons = []
         for i, algo in enumerate(self.algorithms):
@@ -204,7 +210,7 @@ class UIManager:
             else:
                 btn = ToggleButton(
                     rect,
-                    algo.upper(),
+                    algo.replace("_", " ").upper(),
                     self.button_font,
                     COLORS["button_bg"],
                     COLORS["text_primary"],
@@ -301,7 +307,9 @@ class UIManager:
             button.draw(self.screen)
 
         inner = self.algo_card.inner_rect()
-        preview = pygame.Rect(inner.x, inner.y + 210, inner.width, inner.height - 220)
+        # The preview fills whatever the algorithm buttons leave below them.
+        preview_top = self.algo_buttons_bottom + 14
+        preview = pygame.Rect(inner.x, preview_top, inner.width, inner.bottom - preview_top - 10)
         pygame.draw.rect(self.screen, (34, 34, 34), preview, border_radius=10)
         pygame.draw.rect(self.screen, (58, 58, 58), preview, width=1, border_radius=10)
 
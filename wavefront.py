@@ -0,0 +1,81 @@
+"""Vectorized breadth-first distance fields for unweighted grids."""
+
+import numpy as np
+
+# Marker for cells the source cannot reach.
+UNREACHABLE = -1
+
+
+def neighbor_offsets(padded_width):
+    """
+    Flat-index offsets of the six moves on a grid padded by one cell.
+
+    The order matches Grid.get_neighbors: Up, Right, Bottom-Right, Bottom,
+    Left, Top-Left.
+    """
+    return np.array(
+        [-padded_width, 1, padded_width + 1, padded_width, -1, -padded_width - 1],
+        dtype=np.intp,
+    )
+
+
+def open_mask(grid):
+    """
+    Return a flat boolean mask of passable cells with a one-cell wall border.
+
+    The sentinel border lets the wavefront add move offsets without any
+    bounds checks: every step off the grid lands on a blocked cell.
+    """
+    walls = np.frombuffer(grid.wall_map, dtype=np.uint8).reshape(grid.height, grid.width)
+    mask = np.zeros((grid.height + 2, grid.width + 2), dtype=bool)
+    mask[1:-1, 1:-1] = walls == 0
+    return mask.ravel()
+
+
+def distance_field(grid, source):
+    """
+    Compute BFS move counts from ``source`` to every cell of ``grid``.
+
+    The search runs level by level: each level shifts the whole frontier by
+    the six move offsets at once, keeps the passable unvisited targets and
+    makes them the next frontier. Weights are ignored.
+
+    Args:
+        grid: Grid object containing the environment
+        source: Tuple (x, y) the distances are measured from
+
+    Returns:
+        distances: int32 array of shape (height, width) indexed [y, x];
+            UNREACHABLE for cells the source cannot reach
+    """
+    if not grid.in_bounds(source):
+        raise ValueError(f"Source {source} is outside the {grid.width} x {grid.height} grid")
+
+    padded_width = grid.width + 2
+    offsets = neighbor_offsets(padded_width)
+    unvisited = open_mask(grid)
+    distances = np.full(unvisited.size, UNREACHABLE, dtype=np.int32)
+    # Scratch table for deduplicating a level without sorting it.
+    claim = np.empty(unvisited.size, dtype=np.intp)
+
+    x, y = source
+    origin = (y + 1) * padded_width + (x + 1)
+    distances[origin] = 0
+    unvisited[origin] = False
+
+    frontier = np.array([origin], dtype=np.intp)
+    level = 0
+    while frontier.size:
+        level += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[unvisited[candidates]]
+        if not candidates.size:
+            break
+        # Every cell keeps the last candidate slot that claimed it.
+        slots = np.arange(candidates.size)
+        claim[candidates] = slots
+        frontier = candidates[claim[candidates] == slots]
+        unvisited[frontier] = False
+        distances[frontier] = level
+
+    return distances.reshape(grid.height + 2, padded_width)[1:-1, 1:-1].copy()